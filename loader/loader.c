@@ -1484,13 +1484,7 @@ VkResult loader_get_icd_loader_instance_extensions(const struct loader_instance
                 // Remove any extensions not recognized by the loader
                 for (int32_t j = 0; j < (int32_t)icd_exts.count; j++) {
                     // See if the extension is in the list of supported extensions
-                    bool found = false;
-                    for (uint32_t k = 0; LOADER_INSTANCE_EXTENSIONS[k] != NULL; k++) {
-                        if (strcmp(icd_exts.list[j].extensionName, LOADER_INSTANCE_EXTENSIONS[k]) == 0) {
-                            found = true;
-                            break;
-                        }
-                    }
+                    bool found = loader_is_instance_extension_whitelisted(icd_exts.list[j].extensionName);
 
                     // If it isn't in the list, remove it
                     if (!found) {
@@ -4798,13 +4792,7 @@ VkResult loader_validate_instance_extensions(const struct loader_instance *inst,
 
         if (check_if_known) {
             // See if the extension is in the list of supported extensions
-            bool found = false;
-            for (uint32_t j = 0; LOADER_INSTANCE_EXTENSIONS[j] != NULL; j++) {
-                if (strcmp(pCreateInfo->ppEnabledExtensionNames[i], LOADER_INSTANCE_EXTENSIONS[j]) == 0) {
-                    found = true;
-                    break;
-                }
-            }
+            bool found = loader_is_instance_extension_whitelisted(pCreateInfo->ppEnabledExtensionNames[i]);
 
             // If it isn't in the list, return an error
             if (!found) {
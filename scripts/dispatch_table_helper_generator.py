@@ -121,7 +121,14 @@ class DispatchTableHelperOutputGenerator(OutputGenerator):
         preamble = ''
         preamble += '#include <vulkan/vulkan.h>\n'
         preamble += '#include <vulkan/vk_layer.h>\n'
+        preamble += '#include <stddef.h>\n'
         preamble += '#include <string.h>\n'
+        preamble += '\n'
+        preamble += '// Entry in a dispatch table layout: a command name and the offset of its pointer in the table\n'
+        preamble += 'typedef struct LayerDispatchTableEntry {\n'
+        preamble += '    const char *name;\n'
+        preamble += '    size_t offset;\n'
+        preamble += '} LayerDispatchTableEntry;\n'
 
         write(copyright, file=self.outFile)
         write(preamble, file=self.outFile)
@@ -132,7 +139,9 @@ class DispatchTableHelperOutputGenerator(OutputGenerator):
         instance_table = ''
 
         device_table += self.OutputDispatchTableHelper('device')
+        device_table += self.OutputDispatchTableLayout('device')
         instance_table += self.OutputDispatchTableHelper('instance')
+        instance_table += self.OutputDispatchTableLayout('instance')
 
         write(device_table, file=self.outFile);
         write("\n", file=self.outFile)
@@ -151,11 +160,10 @@ class DispatchTableHelperOutputGenerator(OutputGenerator):
         avoid_entries = ['vkCreateInstance',
                          'vkCreateDevice']
         # Get first param type
-        params = cmdinfo.elem.findall('param')
-        info = self.getTypeNameTuple(params[0])
+        params = cmdinfo.getParams()
 
         if name not in avoid_entries:
-            self.AddCommandToDispatchList(name, info[0], self.featureExtraProtect)
+            self.AddCommandToDispatchList(name, params[0].type, self.featureExtraProtect)
 
     #
     # Determine if this API should be ignored or added to the instance or device dispatch table
@@ -169,17 +177,6 @@ class DispatchTableHelperOutputGenerator(OutputGenerator):
             self.instance_dispatch_list.append((name, self.featureExtraProtect))
         return
     #
-    # Retrieve the type and name for a parameter
-    def getTypeNameTuple(self, param):
-        type = ''
-        name = ''
-        for elem in param:
-            if elem.tag == 'type':
-                type = noneStr(elem.text)
-            elif elem.tag == 'name':
-                name = noneStr(elem.text)
-        return (type, name)
-    #
     # Create a dispatch table from the appropriate list and return it as a string
     def OutputDispatchTableHelper(self, table_type):
         entries = []
@@ -215,3 +212,72 @@ class DispatchTableHelperOutputGenerator(OutputGenerator):
                 table += '#endif // %s\n' % item[1]
         table += '}'
         return table
+    #
+    # Create the layout of a dispatch table: an array of its entries sorted by command name,
+    # a lookup of a command's index in that array, and a dispatch table initialization which
+    # copies the entry points of the next layer from a table with the same layout in one pass
+    def OutputDispatchTableLayout(self, table_type):
+        if table_type == 'device':
+            entries = self.device_dispatch_list
+            struct_name = 'VkLayerDispatchTable'
+            handle = 'VkDevice device'
+            gpa_type = 'PFN_vkGetDeviceProcAddr'
+            gpa_name = 'GetDeviceProcAddr'
+        else:
+            entries = self.instance_dispatch_list
+            struct_name = 'VkLayerInstanceDispatchTable'
+            handle = 'VkInstance instance'
+            gpa_type = 'PFN_vkGetInstanceProcAddr'
+            gpa_name = 'GetInstanceProcAddr'
+        prefix = 'layer_%s_dispatch_table' % table_type
+
+        table = '\n\n'
+        table += '// Returns the entries of %s, sorted by command name, and sets *count to their number.\n' % struct_name
+        table += '// Entries for platforms which are not enabled are left out, so indices are only stable for one build.\n'
+        table += 'static inline const LayerDispatchTableEntry *%s_entries(uint32_t *count) {\n' % prefix
+        table += '    static const LayerDispatchTableEntry entries[] = {\n'
+        for (name, protect) in sorted(entries):
+            if protect is not None:
+                table += '#ifdef %s\n' % protect
+            table += '        {"%s", offsetof(%s, %s)},\n' % (name, struct_name, name[2:])
+            if protect is not None:
+                table += '#endif // %s\n' % protect
+        table += '    };\n'
+        table += '    *count = (uint32_t)(sizeof(entries) / sizeof(entries[0]));\n'
+        table += '    return entries;\n'
+        table += '}\n\n'
+
+        table += '// Returns the index of a command in %s_entries(), or -1 if it is not in the table\n' % prefix
+        table += 'static inline int %s_index(const char *name) {\n' % prefix
+        table += '    uint32_t count;\n'
+        table += '    const LayerDispatchTableEntry *entries = %s_entries(&count);\n' % prefix
+        table += '    uint32_t low = 0, high = count;\n'
+        table += '    while (low < high) {\n'
+        table += '        uint32_t mid = low + (high - low) / 2;\n'
+        table += '        int order = strcmp(name, entries[mid].name);\n'
+        table += '        if (order == 0) return (int)mid;\n'
+        table += '        if (order < 0) {\n'
+        table += '            high = mid;\n'
+        table += '        } else {\n'
+        table += '            low = mid + 1;\n'
+        table += '        }\n'
+        table += '    }\n'
+        table += '    return -1;\n'
+        table += '}\n\n'
+
+        table += '// Initializes a dispatch table from next_procs, a table with the same layout holding the next\n'
+        table += '// layer\'s entry points, in one pass. Entries which are NULL in next_procs are resolved with gpa,\n'
+        table += '// as layer_init_%s_dispatch_table() does for every entry.\n' % table_type
+        decl = 'static inline void layer_init_%s_dispatch_table_from(' % table_type
+        table += decl + '%s, %s *table,\n' % (handle, struct_name)
+        table += ' ' * len(decl) + 'const %s *next_procs, %s gpa) {\n' % (struct_name, gpa_type)
+        table += '    uint32_t count;\n'
+        table += '    const LayerDispatchTableEntry *entries = %s_entries(&count);\n' % prefix
+        table += '    memcpy(table, next_procs, sizeof(*table));\n'
+        table += '    for (uint32_t i = 0; i < count; i++) {\n'
+        table += '        PFN_vkVoidFunction *proc = (PFN_vkVoidFunction *)((char *)table + entries[i].offset);\n'
+        table += '        if (*proc == NULL) *proc = gpa(%s, entries[i].name);\n' % handle.split()[1]
+        table += '    }\n'
+        table += '    table->%s = gpa;\n' % gpa_name
+        table += '}'
+        return table
@@ -15,7 +15,7 @@
 # limitations under the License.
 
 from __future__ import unicode_literals
-import io,os,re,sys
+import io,os,re,sys,json,time
 
 def write( *args, **kwargs ):
     file = kwargs.pop('file',sys.stdout)
@@ -146,6 +146,128 @@ class GeneratorOptions:
         else:
             return pat
 
+# CodeWriter - accumulates generated source text as a list of chunks,
+# instead of building it up with repeated string concatenation. Time and memory stay linear in the size
+# of the output.
+#
+# ---- methods ----
+# CodeWriter(indent = '') - indent is the initial indent for line()
+# write(text) - emit text verbatim. 'writer += text' does the same.
+# line(text = '') - emit text prefixed by the current indent and
+#   followed by a newline
+# indent(), dedent() - increase or decrease the current indent by
+#   four spaces
+# beginProtect(protect), endProtect(protect) - emit the '#ifdef' and
+#   '#endif' lines around text guarded by the protect macro. Nothing
+#   is emitted when protect is None.
+# getvalue() - return all text emitted so far
+class CodeWriter:
+    """Accumulate generated source text in linear time"""
+    def __init__(self, indent = ''):
+        self.chunks = []
+        self.indentStr = indent
+    def write(self, text):
+        self.chunks.append(text)
+    def __iadd__(self, text):
+        self.write(text)
+        return self
+    def line(self, text = ''):
+        if (text):
+            self.write(self.indentStr + text + '\n')
+        else:
+            self.write('\n')
+    def indent(self):
+        self.indentStr += '    '
+    def dedent(self):
+        self.indentStr = self.indentStr[:-4]
+    def beginProtect(self, protect):
+        if (protect != None):
+            self.write('#ifdef %s\n' % protect)
+    def endProtect(self, protect):
+        if (protect != None):
+            self.write('#endif // %s\n' % protect)
+    def getvalue(self):
+        text = ''.join(self.chunks)
+        self.chunks = [text]
+        return text
+
+# PhaseTimer - records how long each phase of loading the registry and
+# generating targets takes, using time.perf_counter(), and reports the
+# times as JSON. Phases timed outside of a target are registry phases;
+# phases timed between beginTarget() and endTarget() belong to that
+# target, and are also summed over all targets in the report.
+#
+# ---- methods ----
+# PhaseTimer() - create a timer with no recorded phases
+# beginTarget(target), endTarget() - bracket the generation of the
+#   named target, recording its total time
+# phase(name, feature = None) - context manager timing the enclosed
+#   code as the named phase. If feature is not None, the time is also
+#   recorded for that feature of the current target. Times of a phase
+#   entered more than once are summed.
+# addTarget(target, record) - add the record of a target timed by
+#   another PhaseTimer, e.g. in a worker process
+# report() - return the recorded times as a dictionary:
+#   { 'registry' : { phase : seconds },
+#     'targets' : { target : { 'total' : seconds,
+#                              'phases' : { phase : seconds },
+#                              'features' : { feature : seconds } } },
+#     'totals' : { 'total' : seconds, phase : seconds } }
+# writeReport(file) - write report() to an open file as JSON
+class PhaseTimer:
+    """Record per-phase generation times"""
+    def __init__(self):
+        self.registry = {}
+        self.targets = {}
+        self.current = None
+        self.targetStart = None
+    def beginTarget(self, target):
+        self.current = { 'total' : 0.0, 'phases' : {}, 'features' : {} }
+        self.targets[target] = self.current
+        self.targetStart = time.perf_counter()
+    def endTarget(self):
+        self.current['total'] = time.perf_counter() - self.targetStart
+        self.current = None
+    def phase(self, name, feature = None):
+        return PhaseTimerContext(self, name, feature)
+    def record(self, name, feature, seconds):
+        if (self.current == None):
+            phases = self.registry
+        else:
+            phases = self.current['phases']
+            if (feature != None):
+                features = self.current['features']
+                features[feature] = features.get(feature, 0.0) + seconds
+        phases[name] = phases.get(name, 0.0) + seconds
+    def addTarget(self, target, record):
+        self.targets[target] = record
+    def report(self):
+        totals = { 'total' : 0.0 }
+        for record in self.targets.values():
+            totals['total'] += record['total']
+            for (name, seconds) in record['phases'].items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return { 'registry' : self.registry,
+                 'targets' : self.targets,
+                 'totals' : totals }
+    def writeReport(self, file):
+        json.dump(self.report(), file, indent = 2)
+        file.write('\n')
+
+# PhaseTimerContext - context manager returned by PhaseTimer.phase()
+class PhaseTimerContext:
+    """Time one phase for a PhaseTimer"""
+    def __init__(self, timer, name, feature):
+        self.timer = timer
+        self.name = name
+        self.feature = feature
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self.timer.record(self.name, self.feature, time.perf_counter() - self.start)
+        return False
+
 # OutputGenerator - base class for generating API interfaces.
 # Manages basic logic, logging, and output file control
 # Derived classes actually generate formatted output.
@@ -158,13 +280,17 @@ class GeneratorOptions:
 #   level - 'error', 'warn', or 'diag'. 'error' will also
 #     raise a UserWarning exception
 #   *args - print()-style arguments
+# logEnabled(level) - return True if messages of the given level are
+#   written anywhere, e.g. to do extra work only when its 'diag'
+#   messages will be seen
 # setExtMap(map) - specify a dictionary map from extension names to
 #   numbers, used in creating values for extension enumerants.
 # makeDir(directory) - create a directory, if not already done.
 #   Generally called from derived generators creating hierarchies.
 # beginFile(genOpts) - start a new interface file
 #   genOpts - GeneratorOptions controlling what's generated and how
-# endFile() - finish an interface file, closing it when done
+# endFile() - finish an interface file, closing it when done. The file
+#   is only written if its contents changed.
 # beginFeature(interface, emit) - write interface for a feature
 # and tag generated features as having been done.
 #   interface - element for the <version> / <extension> to generate
@@ -207,6 +333,7 @@ class OutputGenerator:
                  warnFile = sys.stderr,
                  diagFile = sys.stdout):
         self.outFile = None
+        self.outFilename = None
         self.errFile = errFile
         self.warnFile = warnFile
         self.diagFile = diagFile
@@ -244,6 +371,18 @@ class OutputGenerator:
             raise UserWarning(
                 '*** FATAL ERROR in Generator.logMsg: unknown level:' + level)
     #
+    # logEnabled - return True if messages of the given level will be
+    #   written anywhere.
+    # level - 'diag', 'warn', or 'error'
+    def logEnabled(self, level):
+        """Return True if messages at the given level are logged anywhere"""
+        if (level == 'diag'):
+            return self.diagFile != None
+        elif (level == 'warn'):
+            return self.warnFile != None
+        else:
+            return True
+    #
     # enumToValue - parses and converts an <enum> tag into a value.
     # Returns a list
     #   first element - integer representation of the value, or None
@@ -318,20 +457,43 @@ class OutputGenerator:
         #
         # Open specified output file. Not done in constructor since a
         # Generator can be used without writing to a file.
+        # Output is accumulated in memory and only written out by endFile()
+        # if it differs from the existing file, so that regenerating
+        # unchanged output doesn't touch the file and trigger rebuilds.
         if (self.genOpts.filename != None):
-            filename = self.genOpts.directory + '/' + self.genOpts.filename
-            self.outFile = io.open(filename, 'w', encoding='utf-8')
+            self.outFilename = self.genOpts.directory + '/' + self.genOpts.filename
+            self.outFile = io.StringIO()
         else:
+            self.outFilename = None
             self.outFile = sys.stdout
     def endFile(self):
         self.errFile and self.errFile.flush()
         self.warnFile and self.warnFile.flush()
         self.diagFile and self.diagFile.flush()
         self.outFile.flush()
-        if (self.outFile != sys.stdout and self.outFile != sys.stderr):
+        if (self.outFilename != None):
+            self.writeIfChanged(self.outFilename, self.outFile.getvalue())
             self.outFile.close()
         self.genOpts = None
     #
+    # writeIfChanged - write text to filename, unless the file already has
+    #   exactly that content. The file is replaced atomically, so readers
+    #   never see a partially written file.
+    # filename - path of file to write
+    # text - file contents, with newlines written in the platform's text
+    #   mode convention
+    def writeIfChanged(self, filename, text):
+        data = text.replace('\n', os.linesep).encode('utf-8')
+        if os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                if (f.read() == data):
+                    self.logMsg('diag', 'OutputGenerator::writeIfChanged(' + filename + '): unchanged')
+                    return
+        tmpFilename = filename + '.' + str(os.getpid()) + '.tmp'
+        with open(tmpFilename, 'wb') as f:
+            f.write(data)
+        os.replace(tmpFilename, filename)
+    #
     def beginFeature(self, interface, emit):
         self.emit = emit
         self.featureName = interface.get('name')
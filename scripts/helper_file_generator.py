@@ -80,14 +80,16 @@ class HelperFileOutputGenerator(OutputGenerator):
         self.struct_size_h_output = ''                    # string built up of struct size header output
         self.struct_size_c_output = ''                    # string built up of struct size source output
         # Internal state - accumulators for different inner block text
-        self.structNames = []                             # List of Vulkan struct typenames
+        self.structDict = dict()                          # Map of Vulkan struct typename to its StructMemberData record
         self.structTypes = dict()                         # Map of Vulkan struct typename to required VkStructureType
         self.structMembers = []                           # List of StructMemberData records for all Vulkan structs
         self.object_types = []                            # List of all handle types
+        self.handleTypes = None                           # Map of every handle typename in the registry to its defining macro
         self.debug_report_object_types = []               # Handy copy of debug_report_object_type enum data
         self.core_object_types = []                       # Handy copy of core_object_type enum data
         self.device_extension_info = dict()               # Dict of device extension name defines and ifdef values
         self.instance_extension_info = dict()             # Dict of instance extension name defines and ifdef values
+        self.extension_names = dict()                     # Dict of extension name defines and the name strings they define
 
         # Named tuples to store struct and command data
         self.StructType = namedtuple('StructType', ['name', 'value'])
@@ -155,6 +157,7 @@ class HelperFileOutputGenerator(OutputGenerator):
         name = nameElem.get('name')
         if 'EXTENSION_NAME' not in name:
             print("Error in vk.xml file -- extension name is not available")
+        self.extension_names[name] = nameElem.get('value').strip('"')
         if interface.get('type') == 'instance':
             self.instance_extension_info[name] = self.featureExtraProtect
         else:
@@ -201,7 +204,6 @@ class HelperFileOutputGenerator(OutputGenerator):
         if category == 'handle':
             self.object_types.append(name)
         elif (category == 'struct' or category == 'union'):
-            self.structNames.append(name)
             self.genStruct(typeinfo, name)
     #
     # Generate a VkStructureType based on a structure typename
@@ -213,22 +215,6 @@ class HelperFileOutputGenerator(OutputGenerator):
         # Add STRUCTURE_TYPE_
         return re.sub('VK_', 'VK_STRUCTURE_TYPE_', value)
     #
-    # Check if the parameter passed in is a pointer
-    def paramIsPointer(self, param):
-        ispointer = False
-        for elem in param:
-            if ((elem.tag is not 'type') and (elem.tail is not None)) and '*' in elem.tail:
-                ispointer = True
-        return ispointer
-    #
-    # Check if the parameter passed in is a static array
-    def paramIsStaticArray(self, param):
-        isstaticarray = 0
-        paramname = param.find('name')
-        if (paramname.tail is not None) and ('[' in paramname.tail):
-            isstaticarray = paramname.tail.count('[')
-        return isstaticarray
-    #
     # Retrieve the type and name for a parameter
     def getTypeNameTuple(self, param):
         type = ''
@@ -285,6 +271,17 @@ class HelperFileOutputGenerator(OutputGenerator):
             result = str(result).replace('::', '->')
         return result
     #
+    # Return the macro defining a handle type ('VK_DEFINE_HANDLE' or 'VK_DEFINE_NON_DISPATCHABLE_HANDLE'),
+    # or None if the type is not a handle. All handles in the registry are indexed on first use.
+    def getHandleType(self, typename):
+        if self.handleTypes is None:
+            self.handleTypes = dict()
+            for handle in self.registry.tree.findall("types/type[@category='handle']"):
+                name = handle.find('name')
+                if name is not None and name.text not in self.handleTypes:
+                    self.handleTypes[name.text] = handle.find('type').text
+        return self.handleTypes.get(typename)
+    #
     # Check if a structure is or contains a dispatchable (dispatchable = True) or 
     # non-dispatchable (dispatchable = False) handle
     def TypeContainsObjectHandle(self, handle_type, dispatchable):
@@ -292,61 +289,52 @@ class HelperFileOutputGenerator(OutputGenerator):
             type_key = 'VK_DEFINE_HANDLE'
         else:
             type_key = 'VK_DEFINE_NON_DISPATCHABLE_HANDLE'
-        handle = self.registry.tree.find("types/type/[name='" + handle_type + "'][@category='handle']")
-        if handle is not None and handle.find('type').text == type_key:
+        if self.getHandleType(handle_type) == type_key:
             return True
         # if handle_type is a struct, search its members
-        if handle_type in self.structNames:
-            member_index = next((i for i, v in enumerate(self.structMembers) if v[0] == handle_type), None)
-            if member_index is not None:
-                for item in self.structMembers[member_index].members:
-                    handle = self.registry.tree.find("types/type/[name='" + item.type + "'][@category='handle']")
-                    if handle is not None and handle.find('type').text == type_key:
-                        return True
+        if handle_type in self.structDict:
+            for item in self.structDict[handle_type].members:
+                if self.getHandleType(item.type) == type_key:
+                    return True
         return False
     #
     # Generate local ready-access data describing Vulkan structures and unions from the XML metadata
     def genStruct(self, typeinfo, typeName):
         OutputGenerator.genStruct(self, typeinfo, typeName)
-        members = typeinfo.elem.findall('.//member')
-        # Iterate over members once to get length parameters for arrays
-        lens = set()
-        for member in members:
-            len = self.getLen(member)
-            if len:
-                lens.add(len)
+        members = typeinfo.getMembers()
+        # Iterate over members once to get length parameters for arrays.
+        # Only latexmath lengths need translating beyond the shared model.
+        memberLens = [self.getLen(member.elem) if member.len and 'latexmath' in member.len else member.len for member in members]
+        lens = set(len for len in memberLens if len)
         # Generate member info
         membersInfo = []
-        for member in members:
-            # Get the member's type and name
-            info = self.getTypeNameTuple(member)
-            type = info[0]
-            name = info[1]
-            cdecl = self.makeCParamDecl(member, 1)
+        for member, len in zip(members, memberLens):
+            type = member.type
+            name = member.name
+            cdecl = self.makeCParamDecl(member.elem, 1)
             # Process VkStructureType
             if type == 'VkStructureType':
-                # Extract the required struct type value from the comments
-                # embedded in the original text defining the 'typeinfo' element
-                rawXml = etree.tostring(typeinfo.elem).decode('ascii')
-                result = re.search(r'VK_STRUCTURE_TYPE_\w+', rawXml)
-                if result:
-                    value = result.group(0)
-                else:
+                # Look up the required struct type value, generating one from
+                # the struct name if the registry doesn't give it
+                value = self.registry.stypedict.get(typeName)
+                if value is None:
                     value = self.genVkStructureType(typeName)
                 # Store the required type value
                 self.structTypes[typeName] = self.StructType(name=name, value=value)
             # Store pointer/array/string info
-            isstaticarray = self.paramIsStaticArray(member)
             membersInfo.append(self.CommandParam(type=type,
                                                  name=name,
-                                                 ispointer=self.paramIsPointer(member),
-                                                 isstaticarray=isstaticarray,
-                                                 isconst=True if 'const' in cdecl else False,
+                                                 ispointer=member.ispointer,
+                                                 isstaticarray=member.staticarray,
+                                                 isconst=member.isconst,
                                                  iscount=True if name in lens else False,
-                                                 len=self.getLen(member),
+                                                 len=len,
                                                  extstructs=self.registry.validextensionstructs[typeName] if name == 'pNext' else None,
                                                  cdecl=cdecl))
-        self.structMembers.append(self.StructMemberData(name=typeName, members=membersInfo, ifdef_protect=self.featureExtraProtect))
+        structData = self.StructMemberData(name=typeName, members=membersInfo, ifdef_protect=self.featureExtraProtect)
+        self.structMembers.append(structData)
+        if typeName not in self.structDict:
+            self.structDict[typeName] = structData
     #
     # Enum_string_header: Create a routine to convert an enumerated value into a string
     def GenerateEnumStringConversion(self, groupName, value_list):
@@ -458,14 +446,14 @@ class HelperFileOutputGenerator(OutputGenerator):
     # struct_size_helper source -- create bodies of struct size helper functions
     def GenerateStructSizeSource(self):
         # Construct the body of the routine and get_struct_chain_size() simultaneously
-        struct_size_body = ''
-        chain_size  = self.GenerateChainSizePreamble()
+        struct_size_body = CodeWriter()
+        chain_size = CodeWriter()
+        chain_size += self.GenerateChainSizePreamble()
         for item in self.structMembers:
             struct_size_body += '\n'
             lower_case_name = item.name.lower()
-            if item.ifdef_protect != None:
-                struct_size_body += '#ifdef %s\n' % item.ifdef_protect
-                chain_size += '#ifdef %s\n' % item.ifdef_protect
+            struct_size_body.beginProtect(item.ifdef_protect)
+            chain_size.beginProtect(item.ifdef_protect)
             if item.name in self.structTypes:
                 chain_size += '            case %s: {\n' % self.structTypes[item.name].value
                 chain_size += '                struct_size += vk_size_%s((%s*)pNext);\n' % (item.name.lower(), item.name)
@@ -477,7 +465,7 @@ class HelperFileOutputGenerator(OutputGenerator):
             struct_size_body += '        struct_size = sizeof(%s);\n' % item.name
             counter_declared = False
             for member in item.members:
-                vulkan_type = next((i for i, v in enumerate(self.structMembers) if v[0] == member.type), None)
+                vulkan_type = self.structDict.get(member.type)
                 if member.ispointer == True:
                     if vulkan_type is not None:
                         # If this is another Vulkan structure call generated size function
@@ -508,12 +496,11 @@ class HelperFileOutputGenerator(OutputGenerator):
             struct_size_body += '    }\n'
             struct_size_body += '    return struct_size;\n'
             struct_size_body += '}\n'
-            if item.ifdef_protect != None:
-                struct_size_body += '#endif // %s\n' % item.ifdef_protect
-                chain_size += '#endif // %s\n' % item.ifdef_protect
+            struct_size_body.endProtect(item.ifdef_protect)
+            chain_size.endProtect(item.ifdef_protect)
         chain_size += self.GenerateChainSizePostamble()
-        struct_size_body += chain_size;
-        return struct_size_body
+        struct_size_body += chain_size.getvalue()
+        return struct_size_body.getvalue()
     #
     # Combine struct size helper source file preamble with body text and return
     def GenerateStructSizeHelperSource(self):
@@ -545,9 +532,8 @@ class HelperFileOutputGenerator(OutputGenerator):
                     safe_struct_header += '#ifdef %s\n' % item.ifdef_protect
                 safe_struct_header += 'struct safe_%s {\n' % (item.name)
                 for member in item.members:
-                    if member.type in self.structNames:
-                        member_index = next((i for i, v in enumerate(self.structMembers) if v[0] == member.type), None)
-                        if member_index is not None and self.NeedSafeStruct(self.structMembers[member_index]) == True:
+                    if member.type in self.structDict:
+                        if self.NeedSafeStruct(self.structDict[member.type]) == True:
                             if member.ispointer:
                                 safe_struct_header += '    safe_%s* %s;\n' % (member.type, member.name)
                             else:
@@ -578,6 +564,8 @@ class HelperFileOutputGenerator(OutputGenerator):
         struct  = '\n'
         extension_helper_header += '#include <vulkan/vulkan.h>\n'
         extension_helper_header += '#include <string.h>\n'
+        extension_helper_header += '#include <algorithm>\n'
+        extension_helper_header += '#include <iterator>\n'
         extension_helper_header += '#include <utility>\n'
         extension_helper_header += '\n'
         extension_dict = dict()
@@ -598,8 +586,9 @@ class HelperFileOutputGenerator(OutputGenerator):
             else:
                 struct += '    void InitFromDeviceCreateInfo(const InstanceExtensions *instance_extensions, const VkDeviceCreateInfo *pCreateInfo) {\n'
             struct += '\n'
+            # Sorted by extension name, so that the enabled names can be binary searched
             struct += '        static const std::pair<char const *, bool %sExtensions::*> known_extensions[]{\n' % type
-            for ext_name, ifdef in extension_dict.items():
+            for ext_name, ifdef in sorted(extension_dict.items(), key=lambda item: self.extension_names[item[0]]):
                 if ifdef is not None:
                     struct += '#ifdef %s\n' % ifdef
                 bool_name = ext_name.lower()
@@ -616,12 +605,15 @@ class HelperFileOutputGenerator(OutputGenerator):
                 if type == 'Device':
                     struct += '        %s = instance_extensions->%s;\n' % (bool_name, bool_name)
             struct += '\n'
+            struct += '        // known_extensions is sorted by name, so each enabled name is binary searched for\n'
             struct += '        for (uint32_t i = 0; i < pCreateInfo->enabledExtensionCount; i++) {\n'
-            struct += '            for (auto ext : known_extensions) {\n'
-            struct += '                if (!strcmp(ext.first, pCreateInfo->ppEnabledExtensionNames[i])) {\n'
-            struct += '                    this->*(ext.second) = true;\n'
-            struct += '                    break;\n'
-            struct += '                }\n'
+            struct += '            const char *name = pCreateInfo->ppEnabledExtensionNames[i];\n'
+            struct += '            auto ext = std::lower_bound(std::begin(known_extensions), std::end(known_extensions), name,\n'
+            struct += '                                        [](const std::pair<char const *, bool %sExtensions::*> &known, const char *key) {\n' % type
+            struct += '                                            return strcmp(known.first, key) < 0;\n'
+            struct += '                                        });\n'
+            struct += '            if (ext != std::end(known_extensions) && !strcmp(ext->first, name)) {\n'
+            struct += '                this->*(ext->second) = true;\n'
             struct += '            }\n'
             struct += '        }\n'
             struct += '    }\n'
@@ -799,9 +791,8 @@ class HelperFileOutputGenerator(OutputGenerator):
 
             for member in item.members:
                 m_type = member.type
-                if member.type in self.structNames:
-                    member_index = next((i for i, v in enumerate(self.structMembers) if v[0] == member.type), None)
-                    if member_index is not None and self.NeedSafeStruct(self.structMembers[member_index]) == True:
+                if member.type in self.structDict:
+                    if self.NeedSafeStruct(self.structDict[member.type]) == True:
                         m_type = 'safe_%s' % member.type
                 if member.ispointer and 'safe_' not in m_type and self.TypeContainsObjectHandle(member.type, False) == False:
                     # Ptr types w/o a safe_struct, for non-null case need to allocate new ptr and copy data in
@@ -840,9 +831,8 @@ class HelperFileOutputGenerator(OutputGenerator):
                         init_list += '\n    %s(nullptr),' % member.name
                         init_func_txt += '    %s = nullptr;\n' % member.name
                         array_element = 'in_struct->%s[i]' % member.name
-                        if member.type in self.structNames:
-                            member_index = next((i for i, v in enumerate(self.structMembers) if v[0] == member.type), None)
-                            if member_index is not None and self.NeedSafeStruct(self.structMembers[member_index]) == True:
+                        if member.type in self.structDict:
+                            if self.NeedSafeStruct(self.structDict[member.type]) == True:
                                 array_element = '%s(&in_struct->safe_%s[i])' % (member.type, member.name)
                         construct_txt += '    if (%s && in_struct->%s) {\n' % (member.len, member.name)
                         construct_txt += '        %s = new %s[%s];\n' % (member.name, m_type, member.len)
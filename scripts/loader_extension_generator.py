@@ -46,6 +46,15 @@ DEVICE_CMDS_NEED_TERM = ['vkGetDeviceProcAddr',
 
 #
 # LoaderExtensionGeneratorOptions - subclass of GeneratorOptions.
+#
+# Adds options used by LoaderExtensionOutputGenerator objects during
+# loader file generation.
+#
+#   skipDisabledIcdEntries - True if loader_icd_init_entries should only
+#     look up the commands of instance extensions the application enabled.
+#     The loader never returns the commands of other instance extensions,
+#     so their dispatch entries are left NULL instead of being queried from
+#     every ICD at instance creation.
 class LoaderExtensionGeneratorOptions(GeneratorOptions):
     def __init__(self,
                  filename = None,
@@ -69,7 +78,8 @@ class LoaderExtensionGeneratorOptions(GeneratorOptions):
                  apientryp = '',
                  alignFuncParam = 0,
                  currentExtension = '',
-                 extensionOfInterest = 0):
+                 extensionOfInterest = 0,
+                 skipDisabledIcdEntries = False):
         GeneratorOptions.__init__(self, filename, directory, apiname, profile,
                                   versions, emitversions, defaultExtensions,
                                   addExtensions, removeExtensions, sortProcedure)
@@ -84,6 +94,7 @@ class LoaderExtensionGeneratorOptions(GeneratorOptions):
         self.apientry        = apientry
         self.apientryp       = apientryp
         self.alignFuncParam  = alignFuncParam
+        self.skipDisabledIcdEntries = skipDisabledIcdEntries
 #
 # LoaderExtensionOutputGenerator - subclass of OutputGenerator.
 # Generates dispatch table helper header files for LVL
@@ -103,7 +114,7 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
         self.CommandParam = namedtuple('CommandParam', ['type', 'name', 'cdecl'])
         self.CommandData = namedtuple('CommandData', ['name', 'ext_name', 'ext_type', 'protect', 'return_type', 'handle_type', 'params', 'cdecl'])
         self.instanceExtensions = []
-        self.ExtensionData = namedtuple('ExtensionData', ['name', 'type', 'protect', 'define', 'num_commands'])
+        self.ExtensionData = namedtuple('ExtensionData', ['name', 'type', 'protect', 'define', 'define_value', 'num_commands'])
 
     #
     # Called once at the beginning of each run
@@ -149,6 +160,8 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
 
         elif self.genOpts.filename == 'vk_loader_extensions.c':
             preamble += '#define _GNU_SOURCE\n'
+            preamble += '#include <stddef.h>\n'
+            preamble += '#include <stdint.h>\n'
             preamble += '#include <stdio.h>\n'
             preamble += '#include <stdlib.h>\n'
             preamble += '#include <string.h>\n'
@@ -207,11 +220,13 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
         enums = interface[0].findall('enum')
         self.currentExtension = ''
         self.name_definition = ''
+        self.name_definition_value = ''
 
         for item in enums:
             name_definition = item.get('name')
             if 'EXTENSION_NAME' in name_definition:
                 self.name_definition = name_definition
+                self.name_definition_value = item.get('value').strip('"')
 
         self.type = interface.get('type')
         self.num_commands = 0
@@ -224,13 +239,12 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
         OutputGenerator.genCmd(self, cmdinfo, name)
 
         # Get first param type
-        params = cmdinfo.elem.findall('param')
-        info = self.getTypeNameTuple(params[0])
+        params = cmdinfo.getParams()
 
         self.num_commands += 1
 
         if 'android' not in name:
-            self.AddCommandToDispatchList(self.currentExtension, self.type, name, cmdinfo, info[0])
+            self.AddCommandToDispatchList(self.currentExtension, self.type, name, cmdinfo, params[0].type)
 
     def endFeature(self):
 
@@ -239,28 +253,12 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                                                               type=self.type,
                                                               protect=self.featureExtraProtect,
                                                               define=self.name_definition,
+                                                              define_value=self.name_definition_value,
                                                               num_commands=self.num_commands))
 
         # Finish processing in superclass
         OutputGenerator.endFeature(self)
 
-    #
-    # Retrieve the value of the len tag
-    def getLen(self, param):
-        result = None
-        len = param.attrib.get('len')
-        if len and len != 'null-terminated':
-            # For string arrays, 'len' can look like 'count,null-terminated',
-            # indicating that we have a null terminated array of strings.  We
-            # strip the null-terminated from the 'len' field and only return
-            # the parameter specifying the string count
-            if 'null-terminated' in len:
-                result = len.split(',')[0]
-            else:
-                result = len
-            result = str(result).replace('::', '->')
-        return result
-
     #
     # Determine if this API should be ignored or added to the instance or device dispatch table
     def AddCommandToDispatchList(self, extension_name, extension_type, name, cmdinfo, handle_type):
@@ -274,20 +272,9 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
 
         # Generate a list of commands for use in printing the necessary
         # core instance terminator prototypes
-        params = cmdinfo.elem.findall('param')
-        lens = set()
-        for param in params:
-            len = self.getLen(param)
-            if len:
-                lens.add(len)
-        paramsInfo = []
-        for param in params:
-            paramInfo = self.getTypeNameTuple(param)
-            param_type = paramInfo[0]
-            param_name = paramInfo[1]
-            param_cdecl = self.makeCParamDecl(param, 0)
-            cmd_params.append(self.CommandParam(type=param_type, name=param_name,
-                                                cdecl=param_cdecl))
+        for param in cmdinfo.getParams():
+            cmd_params.append(self.CommandParam(type=param.type, name=param.name,
+                                                cdecl=param.cdecl))
 
         if handle != None and handle_type != 'VkInstance' and handle_type != 'VkPhysicalDevice':
             # The Core Vulkan code will be wrapped in a feature called VK_VERSION_#_#
@@ -335,18 +322,6 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                                      params = cmd_params,
                                      cdecl=self.makeCDecls(cmdinfo.elem)[0]))
 
-    #
-    # Retrieve the type and name for a parameter
-    def getTypeNameTuple(self, param):
-        type = ''
-        name = ''
-        for elem in param:
-            if elem.tag == 'type':
-                type = noneStr(elem.text)
-            elif elem.tag == 'name':
-                name = noneStr(elem.text)
-        return (type, name)
-
     def OutputPrototypesInHeader(self):
         protos = ''
         protos += '// Structures defined externally, but used here\n'
@@ -378,6 +353,10 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
         protos += '// Array of extension strings for instance extensions we support.\n'
         protos += 'extern const char *const LOADER_INSTANCE_EXTENSIONS[];\n'
         protos += '\n'
+        protos += '// Returns whether the loader supports an instance extension, i.e. whether its\n'
+        protos += '// name is in LOADER_INSTANCE_EXTENSIONS.\n'
+        protos += 'bool loader_is_instance_extension_whitelisted(const char *name);\n'
+        protos += '\n'
         protos += 'VKAPI_ATTR bool VKAPI_CALL loader_icd_init_entries(struct loader_icd_term *icd_term, VkInstance inst,\n'
         protos += '                                                   const PFN_vkGetInstanceProcAddr fp_gipa);\n'
         protos += '\n'
@@ -411,6 +390,26 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
 
     def OutputUtilitiesInSource(self):
         protos = ''
+        protos += '// Hash functions for the generated perfect hash tables. loader_name_hash() is the 32-bit\n'
+        protos += '// FNV-1a hash of a name, and loader_hash_slot() mixes the seed of the name\'s bucket into it\n'
+        protos += '// with the MurmurHash3 finalizer to give the name\'s slot in the table.\n'
+        protos += 'static inline uint32_t loader_name_hash(const char *name) {\n'
+        protos += '    uint32_t hash = 2166136261u;\n'
+        protos += '    while (*name) {\n'
+        protos += '        hash ^= (uint8_t)*name++;\n'
+        protos += '        hash *= 16777619u;\n'
+        protos += '    }\n'
+        protos += '    return hash;\n'
+        protos += '}\n\n'
+        protos += 'static inline uint32_t loader_hash_slot(uint32_t hash, uint32_t seed, uint32_t slot_count) {\n'
+        protos += '    hash ^= seed;\n'
+        protos += '    hash ^= hash >> 16;\n'
+        protos += '    hash *= 0x85ebca6bu;\n'
+        protos += '    hash ^= hash >> 13;\n'
+        protos += '    hash *= 0xc2b2ae35u;\n'
+        protos += '    hash ^= hash >> 16;\n'
+        protos += '    return hash % slot_count;\n'
+        protos += '}\n\n'
         protos += '// Device extension error function\n'
         protos += 'VKAPI_ATTR VkResult VKAPI_CALL vkDevExtError(VkDevice dev) {\n'
         protos += '    struct loader_device *found_dev;\n'
@@ -582,6 +581,8 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                               'vkEnumerateInstanceLayerProperties',
                              ]
 
+        skip_disabled = self.genOpts.skipDisabledIcdEntries
+        indent = '    '
         for x in range(0, 2):
             if x == 0:
                 commands = self.core_commands
@@ -593,12 +594,23 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                 if ((is_inst_handle_type or cur_cmd.name in DEVICE_CMDS_NEED_TERM) and (cur_cmd.name not in skip_gipa_commands)):
 
                     if cur_cmd.ext_name != cur_extension_name:
+                        if indent != '    ':
+                            table += '    }\n'
+                            indent = '    '
                         if 'VK_VERSION_' in cur_cmd.ext_name:
                             table += '\n    // ---- Core %s\n' % cur_cmd.ext_name[11:]
                         else:
                             table += '\n    // ---- %s extension commands\n' % cur_cmd.ext_name
                         cur_extension_name = cur_cmd.ext_name
 
+                        # Instance extensions whose commands extension_instance_gpa() only returns
+                        # when the extension is enabled don't need their entries looked up otherwise
+                        if (skip_disabled and x == 1 and cur_cmd.ext_type == 'instance' and
+                            cur_cmd.ext_name not in WSI_EXT_NAMES and
+                            cur_cmd.ext_name not in AVOID_EXT_NAMES):
+                            table += '    if (icd_term->this_instance->enabled_known_extensions.%s == 1) {\n' % cur_cmd.ext_name[3:].lower()
+                            indent = '        '
+
                     # Remove 'vk' from proto name
                     base_name = cur_cmd.name[2:]
 
@@ -608,13 +620,15 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                     # The Core Vulkan code will be wrapped in a feature called VK_VERSION_#_#
                     # For example: VK_VERSION_1_0 wraps the core 1.0 Vulkan functionality
                     if x == 0:
-                        table += '    LOOKUP_GIPA(%s, true);\n' % (base_name)
+                        table += '%sLOOKUP_GIPA(%s, true);\n' % (indent, base_name)
                     else:
-                        table += '    LOOKUP_GIPA(%s, false);\n' % (base_name)
+                        table += '%sLOOKUP_GIPA(%s, false);\n' % (indent, base_name)
 
                     if cur_cmd.protect is not None:
                         table += '#endif // %s\n' % cur_cmd.protect
 
+        if indent != '    ':
+            table += '    }\n'
         table += '\n'
         table += '#undef LOOKUP_GIPA\n'
         table += '\n'
@@ -758,33 +772,26 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
     # return it as a string
     def OutputLoaderLookupFunc(self):
         commands = []
-        tables = ''
+        tables = CodeWriter()
         cur_type = ''
-        cur_extension_name = ''
+
+        tables += '// Entry in a perfect hash table of dispatch table commands: the command name without\n'
+        tables += '// its "vk" prefix, and the offset of its pointer in the dispatch table. Unused slots,\n'
+        tables += '// and slots of commands for platforms that aren\'t enabled, have a NULL name.\n'
+        tables += 'struct loader_dispatch_lookup_entry {\n'
+        tables += '    const char *name;\n'
+        tables += '    size_t offset;\n'
+        tables += '};\n\n'
 
         for x in range(0, 2):
             if x == 0:
                 cur_type = 'device'
-
-                tables += '// Device command lookup function\n'
-                tables += 'VKAPI_ATTR void* VKAPI_CALL loader_lookup_device_dispatch_table(const VkLayerDispatchTable *table, const char *name) {\n'
-                tables += '    if (!name || name[0] != \'v\' || name[1] != \'k\') return NULL;\n'
-                tables += '\n'
-                tables += '    name += 2;\n'
+                table_type = 'VkLayerDispatchTable'
             else:
                 cur_type = 'instance'
+                table_type = 'VkLayerInstanceDispatchTable'
 
-                tables += '// Instance command lookup function\n'
-                tables += 'VKAPI_ATTR void* VKAPI_CALL loader_lookup_instance_dispatch_table(const VkLayerInstanceDispatchTable *table, const char *name,\n'
-                tables += '                                                                 bool *found_name) {\n'
-                tables += '    if (!name || name[0] != \'v\' || name[1] != \'k\') {\n'
-                tables += '        *found_name = false;\n'
-                tables += '        return NULL;\n'
-                tables += '    }\n'
-                tables += '\n'
-                tables += '    *found_name = true;\n'
-                tables += '    name += 2;\n'
-
+            entries = []
             for y in range(0, 2):
                 if y == 0:
                     commands = self.core_commands
@@ -795,13 +802,6 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                     is_inst_handle_type = cur_cmd.ext_type == 'instance' or cur_cmd.handle_type == 'VkInstance' or cur_cmd.handle_type == 'VkPhysicalDevice'
                     if ((cur_type == 'instance' and is_inst_handle_type) or (cur_type == 'device' and not is_inst_handle_type)):
 
-                        if cur_cmd.ext_name != cur_extension_name:
-                            if 'VK_VERSION_' in cur_cmd.ext_name:
-                                tables += '\n    // ---- Core %s commands\n' % cur_cmd.ext_name[11:]
-                            else:
-                                tables += '\n    // ---- %s extension commands\n' % cur_cmd.ext_name
-                            cur_extension_name = cur_cmd.ext_name
-
                         # Remove 'vk' from proto name
                         base_name = cur_cmd.name[2:]
 
@@ -810,26 +810,125 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                             base_name == 'EnumerateInstanceLayerProperties'):
                             continue
 
-                        if cur_cmd.protect is not None:
-                            tables += '#ifdef %s\n' % cur_cmd.protect
-
-                        tables += '    if (!strcmp(name, "%s")) return (void *)table->%s;\n' % (base_name, base_name)
-
-                        if cur_cmd.protect is not None:
-                            tables += '#endif // %s\n' % cur_cmd.protect
+                        entries.append((base_name, cur_cmd.protect))
+
+            seeds, slots = self.ComputePerfectHash([name for (name, protect) in entries])
+            protects = dict(entries)
+            prefix = 'loader_%s_dispatch_hash' % cur_type
+
+            tables += '// Perfect hash table of the %s commands, see loader_hash_slot()\n' % cur_type
+            tables += 'static const uint32_t %s_seeds[%d] = {' % (prefix, len(seeds))
+            for index, seed in enumerate(seeds):
+                if index % 8 == 0:
+                    tables += '\n   '
+                tables += ' %du,' % seed
+            tables += '\n};\n\n'
+            tables += 'static const struct loader_dispatch_lookup_entry %s_entries[%d] = {\n' % (prefix, len(slots))
+            for name in slots:
+                if name is None:
+                    tables += '    {NULL, 0},\n'
+                    continue
+                entry = '    {"%s", offsetof(%s, %s)},\n' % (name, table_type, name)
+                if protects[name] is None:
+                    tables += entry
+                else:
+                    tables += '#ifdef %s\n' % protects[name]
+                    tables += entry
+                    tables += '#else\n'
+                    tables += '    {NULL, 0},\n'
+                    tables += '#endif // %s\n' % protects[name]
+            tables += '};\n\n'
 
-            tables += '\n'
+            if x == 0:
+                tables += '// Device command lookup function\n'
+                tables += 'VKAPI_ATTR void* VKAPI_CALL loader_lookup_device_dispatch_table(const VkLayerDispatchTable *table, const char *name) {\n'
+                tables += '    if (!name || name[0] != \'v\' || name[1] != \'k\') return NULL;\n'
+                tables += '\n'
+                tables += '    name += 2;\n'
+            else:
+                tables += '// Instance command lookup function\n'
+                tables += 'VKAPI_ATTR void* VKAPI_CALL loader_lookup_instance_dispatch_table(const VkLayerInstanceDispatchTable *table, const char *name,\n'
+                tables += '                                                                 bool *found_name) {\n'
+                tables += '    if (!name || name[0] != \'v\' || name[1] != \'k\') {\n'
+                tables += '        *found_name = false;\n'
+                tables += '        return NULL;\n'
+                tables += '    }\n'
+                tables += '\n'
+                tables += '    name += 2;\n'
+            tables += '    uint32_t hash = loader_name_hash(name);\n'
+            tables += '    const struct loader_dispatch_lookup_entry *entry =\n'
+            tables += '        &%s_entries[loader_hash_slot(hash, %s_seeds[hash %% %d], %d)];\n' % (prefix, prefix, len(seeds), len(slots))
+            tables += '    if (entry->name == NULL || strcmp(name, entry->name)) {\n'
+            if x == 1:
+                tables += '        *found_name = false;\n'
+            tables += '        return NULL;\n'
+            tables += '    }\n'
             if x == 1:
-                tables += '    *found_name = false;\n'
-            tables += '    return NULL;\n'
+                tables += '    *found_name = true;\n'
+            tables += '    return *(void *const *)((const char *)table + entry->offset);\n'
             tables += '}\n\n'
-        return tables
+        return tables.getvalue()
+
+    #
+    # Compute a perfect hash of names, for lookup tables searched with
+    # loader_name_hash() and loader_hash_slot(). Names are divided into
+    # buckets by their hash, and each bucket is given the first seed which
+    # places all of its names in unused slots, starting with the largest
+    # buckets. The lookup of every name is then checked, so a collision
+    # fails generation. Returns the list of bucket seeds and the list of
+    # slots, each holding a name or None.
+    def ComputePerfectHash(self, names):
+        bucket_count = max(1, (len(names) + 3) // 4)
+        slot_count = max(1, len(names) + len(names) // 4)
+        hashes = [self.NameHash(name) for name in names]
+        if len(set(hashes)) != len(hashes):
+            self.logMsg('error', 'Perfect hash input has names with the same hash')
+        buckets = [[] for index in range(bucket_count)]
+        for name, hash in zip(names, hashes):
+            buckets[hash % bucket_count].append((name, hash))
+        seeds = [0] * bucket_count
+        slots = [None] * slot_count
+        for index in sorted(range(bucket_count), key=lambda index: -len(buckets[index])):
+            if not buckets[index]:
+                break
+            seed = 0
+            while True:
+                bucket_slots = [self.HashSlot(hash, seed, slot_count) for (name, hash) in buckets[index]]
+                if (len(set(bucket_slots)) == len(bucket_slots) and
+                    all(slots[slot] is None for slot in bucket_slots)):
+                    break
+                seed += 1
+            seeds[index] = seed
+            for (name, hash), slot in zip(buckets[index], bucket_slots):
+                slots[slot] = name
+        # Check every name is found in its own slot by the lookup
+        for name, hash in zip(names, hashes):
+            if slots[self.HashSlot(hash, seeds[hash % bucket_count], slot_count)] != name:
+                self.logMsg('error', 'Perfect hash lookup of', name, 'collides')
+        return seeds, slots
+    #
+    # 32-bit FNV-1a hash of a name, matching loader_name_hash()
+    def NameHash(self, name):
+        hash = 2166136261
+        for char in name.encode('utf-8'):
+            hash = ((hash ^ char) * 16777619) & 0xffffffff
+        return hash
+    #
+    # Slot of a name hash mixed with a bucket seed, matching loader_hash_slot()
+    def HashSlot(self, hash, seed, slot_count):
+        hash ^= seed
+        hash ^= hash >> 16
+        hash = (hash * 0x85ebca6b) & 0xffffffff
+        hash ^= hash >> 13
+        hash = (hash * 0xc2b2ae35) & 0xffffffff
+        hash ^= hash >> 16
+        return hash % slot_count
 
     #
     # Create the appropriate trampoline (and possibly terminator) functinos
     def CreateTrampTermFuncs(self):
         entries = []
-        funcs = ''
+        funcs = CodeWriter()
         cur_extension_name = ''
 
         # Some extensions have to be manually added.  Skip those in the automatic
@@ -866,8 +965,7 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                     funcs += '\n// ---- %s extension trampoline/terminators\n\n' % ext_cmd.ext_name
                 cur_extension_name = ext_cmd.ext_name
 
-            if ext_cmd.protect is not None:
-                funcs += '#ifdef %s\n' % ext_cmd.protect
+            funcs.beginProtect(ext_cmd.protect)
 
             func_header = ext_cmd.cdecl.replace(";", " {\n")
             tramp_header = func_header.replace("VKAPI_CALL vk", "VKAPI_CALL ")
@@ -1160,22 +1258,17 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                 funcs += ');\n'
                 funcs += '}\n\n'
 
-            if ext_cmd.protect is not None:
-                funcs += '#endif // %s\n' % ext_cmd.protect
+            funcs.endProtect(ext_cmd.protect)
 
-        return funcs
+        return funcs.getvalue()
 
 
     #
     # Create a function for the extension GPA call
     def InstExtensionGPA(self):
         entries = []
-        gpa_func = ''
-        cur_extension_name = ''
-
-        gpa_func += '// GPA helpers for extensions\n'
-        gpa_func += 'bool extension_instance_gpa(struct loader_instance *ptr_instance, const char *name, void **addr) {\n'
-        gpa_func += '    *addr = NULL;\n\n'
+        enables = []
+        gpa_func = CodeWriter()
 
         for cur_cmd in self.ext_commands:
             if ('VK_VERSION_' in cur_cmd.ext_name or
@@ -1183,80 +1276,166 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
                 cur_cmd.ext_name in AVOID_EXT_NAMES):
                 continue
 
-            if cur_cmd.ext_name != cur_extension_name:
-                gpa_func += '\n    // ---- %s extension commands\n' % cur_cmd.ext_name
-                cur_extension_name = cur_cmd.ext_name
+            # Instance extension commands are only returned when their extension is enabled,
+            # which is checked by the extension's index in loader_instance_extension_enabled()
+            enable = 0
+            if (cur_cmd.ext_type == 'instance'):
+                enable_flag = cur_cmd.ext_name[3:].lower()
+                if enable_flag not in enables:
+                    enables.append(enable_flag)
+                enable = enables.index(enable_flag) + 1
 
-            if cur_cmd.protect is not None:
-                gpa_func += '#ifdef %s\n' % cur_cmd.protect
+            entries.append((cur_cmd.name, cur_cmd.protect, enable))
 
-            base_name = cur_cmd.name[2:]
+        seeds, slots = self.ComputePerfectHash([name for (name, protect, enable) in entries])
+        entry_data = dict((name, (protect, enable)) for (name, protect, enable) in entries)
 
-            if (cur_cmd.ext_type == 'instance'):
-                gpa_func += '    if (!strcmp("%s", name)) {\n' % (cur_cmd.name)
-                gpa_func += '        *addr = (ptr_instance->enabled_known_extensions.'
-                gpa_func += cur_cmd.ext_name[3:].lower()
-                gpa_func += ' == 1)\n'
-                gpa_func += '                     ? (void *)%s\n' % (base_name)
-                gpa_func += '                     : NULL;\n'
-                gpa_func += '        return true;\n'
-                gpa_func += '    }\n'
-            else:
-                gpa_func += '    if (!strcmp("%s", name)) {\n' % (cur_cmd.name)
-                gpa_func += '        *addr = (void *)%s;\n' % (base_name)
-                gpa_func += '        return true;\n'
-                gpa_func += '    }\n'
+        gpa_func += '// GPA helpers for extensions\n'
+        gpa_func += '// Returns whether the instance extension with the given index in extension_instance_gpa()\'s\n'
+        gpa_func += '// table is enabled. Index 0 is used for commands which are always available.\n'
+        gpa_func += 'static bool loader_instance_extension_enabled(const struct loader_instance *ptr_instance, uint32_t enable) {\n'
+        gpa_func += '    switch (enable) {\n'
+        gpa_func += '        case 0:\n'
+        gpa_func += '            return true;\n'
+        for index, enable_flag in enumerate(enables):
+            gpa_func += '        case %d:\n' % (index + 1)
+            gpa_func += '            return ptr_instance->enabled_known_extensions.%s == 1;\n' % enable_flag
+        gpa_func += '        default:\n'
+        gpa_func += '            return false;\n'
+        gpa_func += '    }\n'
+        gpa_func += '}\n\n'
 
-            if cur_cmd.protect is not None:
-                gpa_func += '#endif // %s\n' % cur_cmd.protect
+        gpa_func += '// Entry in the perfect hash table of extension commands for extension_instance_gpa()\n'
+        gpa_func += 'struct loader_extension_gpa_entry {\n'
+        gpa_func += '    const char *name;\n'
+        gpa_func += '    void *addr;\n'
+        gpa_func += '    uint32_t enable;\n'
+        gpa_func += '};\n\n'
+        gpa_func += 'static const uint32_t loader_extension_gpa_hash_seeds[%d] = {' % len(seeds)
+        for index, seed in enumerate(seeds):
+            if index % 8 == 0:
+                gpa_func += '\n   '
+            gpa_func += ' %du,' % seed
+        gpa_func += '\n};\n\n'
+        gpa_func += 'static const struct loader_extension_gpa_entry loader_extension_gpa_hash_entries[%d] = {\n' % len(slots)
+        for name in slots:
+            if name is None:
+                gpa_func += '    {NULL, NULL, 0},\n'
+                continue
+            protect, enable = entry_data[name]
+            entry = '    {"%s", (void *)%s, %d},\n' % (name, name[2:], enable)
+            if protect is None:
+                gpa_func += entry
+            else:
+                gpa_func += '#ifdef %s\n' % protect
+                gpa_func += entry
+                gpa_func += '#else\n'
+                gpa_func += '    {NULL, NULL, 0},\n'
+                gpa_func += '#endif // %s\n' % protect
+        gpa_func += '};\n\n'
 
-        gpa_func += '    return false;\n'
+        gpa_func += 'bool extension_instance_gpa(struct loader_instance *ptr_instance, const char *name, void **addr) {\n'
+        gpa_func += '    *addr = NULL;\n\n'
+        gpa_func += '    uint32_t hash = loader_name_hash(name);\n'
+        gpa_func += '    const struct loader_extension_gpa_entry *entry =\n'
+        gpa_func += '        &loader_extension_gpa_hash_entries[loader_hash_slot(hash, loader_extension_gpa_hash_seeds[hash %% %d], %d)];\n' % (len(seeds), len(slots))
+        gpa_func += '    if (entry->name == NULL || strcmp(name, entry->name)) {\n'
+        gpa_func += '        return false;\n'
+        gpa_func += '    }\n'
+        gpa_func += '    *addr = loader_instance_extension_enabled(ptr_instance, entry->enable) ? entry->addr : NULL;\n'
+        gpa_func += '    return true;\n'
         gpa_func += '}\n\n'
 
-        return gpa_func
+        return gpa_func.getvalue()
 
     #
-    # Create the extension name init function
+    # Create the extension name init function, and the perfect hash table of
+    # instance extension names it shares with loader_is_instance_extension_whitelisted()
     def InstantExtensionCreate(self):
         entries = []
-        entries = self.instanceExtensions
-        count = 0
-        cur_extension_name = ''
+        enables = []
+        create_func = CodeWriter()
 
-        create_func = ''
-        create_func += '// A function that can be used to query enabled extensions during a vkCreateInstance call\n'
-        create_func += 'void extensions_create_instance(struct loader_instance *ptr_instance, const VkInstanceCreateInfo *pCreateInfo) {\n'
-        create_func += '    for (uint32_t i = 0; i < pCreateInfo->enabledExtensionCount; i++) {\n'
-        for ext in entries:
-            if ('VK_VERSION_' in ext.name or ext.name in WSI_EXT_NAMES or
-                ext.name in AVOID_EXT_NAMES or ext.type == 'device' or
-                ext.num_commands == 0):
+        for ext in self.instanceExtensions:
+            if ext.type == 'device' or 'VK_VERSION_' in ext.name:
                 continue
 
-            if ext.name != cur_extension_name:
-                create_func += '\n    // ---- %s extension commands\n' % ext.name
-                cur_extension_name = ext.name
-
-            if ext.protect is not None:
-                create_func += '#ifdef %s\n' % ext.protect
-            if count == 0:
-                create_func += '        if (0 == strcmp(pCreateInfo->ppEnabledExtensionNames[i], '
+            # Extensions with an enabled_known_extensions flag set by extensions_create_instance()
+            # are given its index in the switch, and the rest are given index 0
+            enable = 0
+            if (ext.name not in WSI_EXT_NAMES and ext.name not in AVOID_EXT_NAMES and
+                ext.num_commands != 0):
+                enables.append(ext)
+                enable = len(enables)
+
+            # Hashed by the string the define expands to, which is what the application passes,
+            # rather than the extension name in the registry, as the two don't always match
+            entries.append((ext.define_value, ext.define, ext.protect, enable))
+
+        seeds, slots = self.ComputePerfectHash([name for (name, define, protect, enable) in entries])
+        entry_data = dict((name, (define, protect, enable)) for (name, define, protect, enable) in entries)
+
+        create_func += '// Entry in the perfect hash table of the instance extensions in LOADER_INSTANCE_EXTENSIONS\n'
+        create_func += 'struct loader_instance_extension_entry {\n'
+        create_func += '    const char *name;\n'
+        create_func += '    uint32_t enable;\n'
+        create_func += '};\n\n'
+        create_func += 'static const uint32_t loader_instance_extension_hash_seeds[%d] = {' % len(seeds)
+        for index, seed in enumerate(seeds):
+            if index % 8 == 0:
+                create_func += '\n   '
+            create_func += ' %du,' % seed
+        create_func += '\n};\n\n'
+        create_func += 'static const struct loader_instance_extension_entry loader_instance_extension_hash_entries[%d] = {\n' % len(slots)
+        for name in slots:
+            if name is None:
+                create_func += '    {NULL, 0},\n'
+                continue
+            define, protect, enable = entry_data[name]
+            entry = '    {%s, %d},\n' % (define, enable)
+            if protect is None:
+                create_func += entry
             else:
-                create_func += '        } else if (0 == strcmp(pCreateInfo->ppEnabledExtensionNames[i], '
-
-            create_func += ext.define + ')) {\n'
-            create_func += '            ptr_instance->enabled_known_extensions.'
-            create_func += ext.name[3:].lower()
-            create_func += ' = 1;\n'
-
-            if ext.protect is not None:
-                create_func += '#endif // %s\n' % ext.protect
-            count += 1
+                create_func += '#ifdef %s\n' % protect
+                create_func += entry
+                create_func += '#else\n'
+                create_func += '    {NULL, 0},\n'
+                create_func += '#endif // %s\n' % protect
+        create_func += '};\n\n'
+
+        create_func += '// Returns the hash table entry of an instance extension name, or NULL if the loader doesn\'t support it\n'
+        create_func += 'static const struct loader_instance_extension_entry *loader_instance_extension_lookup(const char *name) {\n'
+        create_func += '    uint32_t hash = loader_name_hash(name);\n'
+        create_func += '    const struct loader_instance_extension_entry *entry =\n'
+        create_func += '        &loader_instance_extension_hash_entries[loader_hash_slot(hash, loader_instance_extension_hash_seeds[hash %% %d], %d)];\n' % (len(seeds), len(slots))
+        create_func += '    if (entry->name == NULL || strcmp(name, entry->name)) {\n'
+        create_func += '        return NULL;\n'
+        create_func += '    }\n'
+        create_func += '    return entry;\n'
+        create_func += '}\n\n'
 
+        create_func += '// A function that can be used to query enabled extensions during a vkCreateInstance call\n'
+        create_func += 'void extensions_create_instance(struct loader_instance *ptr_instance, const VkInstanceCreateInfo *pCreateInfo) {\n'
+        create_func += '    for (uint32_t i = 0; i < pCreateInfo->enabledExtensionCount; i++) {\n'
+        create_func += '        const struct loader_instance_extension_entry *entry = loader_instance_extension_lookup(pCreateInfo->ppEnabledExtensionNames[i]);\n'
+        create_func += '        if (entry == NULL) {\n'
+        create_func += '            continue;\n'
+        create_func += '        }\n'
+        create_func += '        switch (entry->enable) {\n'
+        for index, ext in enumerate(enables):
+            if index > 0:
+                create_func += '\n'
+            create_func += '            // ---- %s extension commands\n' % ext.name
+            create_func += '            case %d:\n' % (index + 1)
+            create_func += '                ptr_instance->enabled_known_extensions.%s = 1;\n' % ext.name[3:].lower()
+            create_func += '                break;\n'
+        create_func += '\n'
+        create_func += '            default:\n'
+        create_func += '                break;\n'
         create_func += '        }\n'
         create_func += '    }\n'
         create_func += '}\n\n'
-        return create_func
+        return create_func.getvalue()
 
     #
     # Create code to initialize a dispatch table from the appropriate list of
@@ -1377,5 +1556,11 @@ class LoaderExtensionOutputGenerator(OutputGenerator):
             if ext.protect is not None:
                 table += '#endif // %s\n' % ext.protect
         table += '                                                  NULL };\n'
+        table += '\n'
+        table += '// Returns whether an instance extension name is in LOADER_INSTANCE_EXTENSIONS, using the hash table\n'
+        table += '// built for extensions_create_instance()\n'
+        table += 'bool loader_is_instance_extension_whitelisted(const char *name) {\n'
+        table += '    return loader_instance_extension_lookup(name) != NULL;\n'
+        table += '}\n'
         return table
 
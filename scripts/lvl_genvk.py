@@ -14,9 +14,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import argparse, cProfile, pdb, string, sys, time
+import argparse, concurrent.futures, cProfile, multiprocessing, os, pdb, string, sys, time
 from reg import *
-from generator import write
+from generator import write, PhaseTimer
 from cgenerator import CGeneratorOptions, COutputGenerator
 # LoaderAndValidationLayer Generator Modifications
 from threading_generator import  ThreadGeneratorOptions, ThreadOutputGenerator
@@ -26,17 +26,18 @@ from object_tracker_generator import ObjectTrackerGeneratorOptions, ObjectTracke
 from dispatch_table_helper_generator import DispatchTableHelperOutputGenerator, DispatchTableHelperOutputGeneratorOptions
 from helper_file_generator import HelperFileOutputGenerator, HelperFileOutputGeneratorOptions
 from loader_extension_generator import LoaderExtensionOutputGenerator, LoaderExtensionGeneratorOptions
+import vuid_mapping
 
 # Simple timer functions
 startTime = None
 
 def startTimer(timeit):
     global startTime
-    startTime = time.clock()
+    startTime = time.perf_counter()
 
 def endTimer(timeit, msg):
     global startTime
-    endTime = time.clock()
+    endTime = time.perf_counter()
     if (timeit):
         write(msg, endTime - startTime, file=sys.stderr)
         startTime = None
@@ -52,7 +53,12 @@ def makeREstring(list):
 # extensions - list of extension names to include.
 # protect - True if re-inclusion protection should be added to headers
 # directory - path to directory in which to generate the target(s)
-def makeGenOpts(extensions = [], removeExtensions = [], protect = True, directory = '.'):
+# vuidFile - path to vk_validation_error_messages.h, or None to search for it
+# vuidCacheFile - file in which to cache the parsed VUID catalog, or None
+# skipDisabledIcdEntries - True if the loader should only look up the ICD
+#   entry points of instance extensions the application enabled
+def makeGenOpts(extensions = [], removeExtensions = [], protect = True, directory = '.',
+                vuidFile = None, vuidCacheFile = None, skipDisabledIcdEntries = False):
     global genOpts
     genOpts = {}
 
@@ -141,7 +147,9 @@ def makeGenOpts(extensions = [], removeExtensions = [], protect = True, director
             apicall           = 'VKAPI_ATTR ',
             apientry          = 'VKAPI_CALL ',
             apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48)
+            alignFuncParam    = 48,
+            vuidFile          = vuidFile,
+            vuidCacheFile     = vuidCacheFile)
         ]
 
     # Options for unique objects layer
@@ -183,7 +191,9 @@ def makeGenOpts(extensions = [], removeExtensions = [], protect = True, director
             apicall           = 'VKAPI_ATTR ',
             apientry          = 'VKAPI_CALL ',
             apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48)
+            alignFuncParam    = 48,
+            vuidFile          = vuidFile,
+            vuidCacheFile     = vuidCacheFile)
         ]
 
     # Options for dispatch table helper generator
@@ -267,7 +277,8 @@ def makeGenOpts(extensions = [], removeExtensions = [], protect = True, director
             apicall           = 'VKAPI_ATTR ',
             apientry          = 'VKAPI_CALL ',
             apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48)
+            alignFuncParam    = 48,
+            skipDisabledIcdEntries = skipDisabledIcdEntries)
         ]
 
     # Helper file generator options for vk_enum_string_helper.h
@@ -427,42 +438,119 @@ def makeGenOpts(extensions = [], removeExtensions = [], protect = True, director
 
 # Generate a target based on the options in the matching genOpts{} object.
 # This is encapsulated in a function so it can be profiled and/or timed.
-# The args parameter is an parsed argument object containing the following
-# fields that are used:
-#   target - target to generate
-#   directory - directory to generate it in
-#   protect - True if re-inclusion wrappers should be created
-#   extensions - list of additional extensions to include in generated
-#   interfaces
-def genTarget(args):
+# The parameters are:
+#   args - parsed argument object containing the following fields that are used:
+#     directory - directory to generate it in
+#     protect - True if re-inclusion wrappers should be created
+#     extensions - list of additional extensions to include in generated
+#     interfaces
+#   target - name of the target to generate
+def genTarget(args, target):
     global genOpts
 
-    # Create generator options with specified parameters
-    makeGenOpts(extensions = args.extension,
-                removeExtensions = args.removeExtension,
-                protect = args.protect,
-                directory = args.directory)
-
-    if (args.target in genOpts.keys()):
-        createGenerator = genOpts[args.target][0]
-        options = genOpts[args.target][1]
+    if (target in genOpts.keys()):
+        createGenerator = genOpts[target][0]
+        options = genOpts[target][1]
 
         if not args.quiet:
             write('* Building', options.filename, file=sys.stderr)
 
         startTimer(args.time)
+        if (reg.timer != None):
+            reg.timer.beginTarget(options.filename)
         gen = createGenerator(errFile=errWarn,
                               warnFile=errWarn,
                               diagFile=diag)
         reg.setGenerator(gen)
         reg.apiGen(options)
+        if (reg.timer != None):
+            reg.timer.endTarget()
 
         if not args.quiet:
             write('* Generated', options.filename, file=sys.stderr)
         endTimer(args.time, '* Time to generate ' + options.filename + ' =')
     else:
         write('No generator options for unknown target:',
-              args.target, file=sys.stderr)
+              target, file=sys.stderr)
+
+# Generate every target named in args.target from the already-loaded
+# registry, so that vk.xml is only parsed once per invocation. The special
+# target name 'all' expands to every target defined in genOpts{}.
+def genTargets(args):
+    global genOpts
+
+    # Create generator options with specified parameters
+    makeGenOpts(extensions = args.extension,
+                removeExtensions = args.removeExtension,
+                protect = args.protect,
+                directory = args.directory,
+                vuidFile = args.vuidfile,
+                vuidCacheFile = args.vuidcache,
+                skipDisabledIcdEntries = args.skipdisabledicdentries)
+
+    targets = []
+    for target in args.target:
+        if (target == 'all'):
+            targets += [name for name in genOpts.keys() if name not in targets]
+        elif (target not in targets):
+            targets.append(target)
+
+    if (args.jobs > 1 and len(targets) > 1):
+        # Worker processes must inherit the loaded registry, generator
+        # options and output files, which requires fork(). Where that is
+        # unavailable (e.g. Windows), generate the targets serially.
+        # Each worker would also buffer its own writes to a -diagfile or
+        # -errfile, interleaving the messages of different targets in
+        # arbitrary chunks, so those are only written serially.
+        if (args.diagfile or args.errfile):
+            write('* -diagfile and -errfile are written serially, generating targets serially',
+                  file=sys.stderr)
+        elif ('fork' in multiprocessing.get_all_start_methods()):
+            genTargetsParallel(args, targets)
+            return
+        else:
+            write('* Parallel generation unavailable, generating targets serially',
+                  file=sys.stderr)
+    for target in targets:
+        genTarget(args, target)
+
+# Generate targets in a pool of args.jobs forked worker processes. Each
+# worker shares the parent's parsed registry copy-on-write, and each target
+# writes its own output file, so the targets are independent of each other.
+# An exception raised by a worker, including the SystemExit raised when a
+# generator exits on an error, is re-raised here once the targets still
+# queued are cancelled, so the run fails as it would serially. A worker
+# which dies outright raises BrokenProcessPool instead of hanging the run.
+def genTargetsParallel(args, targets):
+    global workerArgs
+    workerArgs = args
+    # Flush buffered output so forked workers do not write it again
+    for f in [sys.stdout, sys.stderr, errWarn, diag]:
+        f and f.flush()
+    context = multiprocessing.get_context('fork')
+    with concurrent.futures.ProcessPoolExecutor(max_workers = min(args.jobs, len(targets)),
+                                                mp_context = context) as executor:
+        futures = [executor.submit(genTargetWorker, target) for target in targets]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                (target, timing) = future.result()
+                if (timing != None):
+                    reg.timer.addTarget(target, timing)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+# Worker entry point for genTargetsParallel(). Returns the target and, if
+# phases are being timed, its timing record for the parent's report.
+def genTargetWorker(target):
+    genTarget(workerArgs, target)
+    for f in [sys.stdout, sys.stderr, errWarn, diag]:
+        f and f.flush()
+    timing = None
+    if (reg.timer != None and target in genOpts):
+        timing = reg.timer.targets[genOpts[target][1].filename]
+    return (target, timing)
 
 # -extension name - may be a single extension name, a a space-separated list
 # of names, or a regular expression.
@@ -492,28 +580,64 @@ if __name__ == '__main__':
     parser.add_argument('-registry', action='store',
                         default='vk.xml',
                         help='Use specified registry file instead of vk.xml')
+    parser.add_argument('-jobs', action='store', type=int,
+                        default=1,
+                        help='Generate targets using the specified number of worker processes')
+    parser.add_argument('-xml', action='store',
+                        choices=['etree', 'lxml'], default='etree',
+                        help='Use the specified XML backend to load the registry')
+    parser.add_argument('-vuidfile', action='store',
+                        default=None,
+                        help='Use specified vk_validation_error_messages.h instead of ../layers relative to the registry')
+    parser.add_argument('-vuidcache', action='store',
+                        default=None,
+                        help='Save the parsed VUID catalog to, and reuse it from, the specified cache file')
+    parser.add_argument('-allowunmappedvuids', action='store_true',
+                        help='Treat VUIDs of commands, structs and params missing from vuid_mapping.py as undefined instead of exiting')
+    parser.add_argument('-skipdisabledicdentries', action='store_true',
+                        help='Only look up the ICD entry points of instance extensions the application enabled in vk_loader_extensions.c')
     parser.add_argument('-time', action='store_true',
                         help='Enable timing')
+    parser.add_argument('-timefile', action='store',
+                        default=None,
+                        help='Write a JSON report of per-phase registry and generation times to the specified file, or - for stdout')
     parser.add_argument('-validate', action='store_true',
                         help='Enable group validation')
     parser.add_argument('-o', action='store', dest='directory',
                         default='.',
                         help='Create target and related files in specified directory')
-    parser.add_argument('target', metavar='target', nargs='?',
-                        help='Specify target')
+    parser.add_argument('target', metavar='target', nargs='*',
+                        help='Specify target(s), or \'all\' for every target')
     parser.add_argument('-quiet', action='store_true', default=False,
                         help='Suppress script output during normal execution.')
 
     args = parser.parse_args()
+    if (not args.target):
+        parser.error('at least one target is required')
+
+    vuid_mapping.allow_unmapped = args.allowunmappedvuids
 
     # This splits arguments which are space-separated lists
     args.extension = [name for arg in args.extension for name in arg.split()]
 
+    # vk_validation_error_messages.h lives in the layers directory alongside
+    # the scripts directory holding vk.xml, wherever the generator is run from
+    if (args.vuidfile == None):
+        args.vuidfile = os.path.join(os.path.dirname(os.path.abspath(args.registry)),
+                                     '..', 'layers', 'vk_validation_error_messages.h')
+
     # Load & parse registry
     reg = Registry()
+    if (args.timefile):
+        reg.timer = PhaseTimer()
+
+    if (args.xml not in xmlBackends):
+        write('* XML backend', args.xml, 'is unavailable, using etree', file=sys.stderr)
+        args.xml = 'etree'
 
     startTimer(args.time)
-    tree = etree.parse(args.registry)
+    with reg.timePhase('parseXML'):
+        tree = parseXML(args.registry, args.xml)
     endTimer(args.time, '* Time to make ElementTree =')
 
     startTimer(args.time)
@@ -539,11 +663,17 @@ if __name__ == '__main__':
         diag = None
 
     if (args.debug):
-        pdb.run('genTarget(args)')
+        pdb.run('genTargets(args)')
     elif (args.profile):
         import cProfile, pstats
-        cProfile.run('genTarget(args)', 'profile.txt')
+        cProfile.run('genTargets(args)', 'profile.txt')
         p = pstats.Stats('profile.txt')
         p.strip_dirs().sort_stats('time').print_stats(50)
     else:
-        genTarget(args)
+        genTargets(args)
+
+    if (args.timefile == '-'):
+        reg.timer.writeReport(sys.stdout)
+    elif (args.timefile):
+        with open(args.timefile, 'w', encoding='utf-8') as timefile:
+            reg.timer.writeReport(timefile)
@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2017 The Khronos Group Inc.
+# Copyright (c) 2017 Valve Corporation
+# Copyright (c) 2017 LunarG, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse, gc, json, os, shutil, statistics, sys, tempfile, time, tracemalloc
+
+#############################
+# lvl_genvk_benchmark.py
+#
+# Times loading the registry and generating each lvl_genvk.py target, and
+# optionally compares the results against a baseline saved by an earlier
+# run. For the registry and for each target it records:
+#   peak - peak memory allocated by Python during the first, cold run, in
+#     bytes, as reported by tracemalloc
+#   first - wall time of the first timed run, which is made with a newly
+#     loaded registry and so includes the cost of a cold start
+#   best - best wall time over the repeated runs
+#   seconds - median wall time over the repeated runs
+#   passes - median time of the two passes Registry.apiGen makes over the
+#     features, tagging them as required (pass 1) and generating them
+#     (pass 2), as recorded by PhaseTimer (targets only)
+#   size - size of the generated file, in bytes (targets only)
+# Each target is measured with freshly loaded registries, so that the
+# results don't depend on which targets were generated before it.
+# Output is written to a scratch directory, which is removed afterwards.
+#
+# Only the median times are compared against the baseline, since the best
+# and first times are too sensitive to timer noise. A result regresses if
+# it exceeds its baseline by more than the -threshold fraction and, for
+# times, also by more than -mintime seconds, so that noise on the
+# smallest targets isn't reported. The exit status is 1 if any result
+# regressed.
+#
+# Examples, run from the scripts directory:
+#   python3 lvl_genvk_benchmark.py -save baseline.json
+#   python3 lvl_genvk_benchmark.py -baseline baseline.json
+#   python3 lvl_genvk_benchmark.py -baseline baseline.json parameter_validation.cpp
+
+import lvl_genvk, vuid_mapping
+from generator import PhaseTimer
+from reg import Registry, parseXML
+
+# timeRun - return the first, best and median wall times of repeats
+# calls of func, as a dictionary of { 'first', 'best', 'seconds' }. As in
+# timeit, garbage collection is disabled while func runs, after collecting
+# what earlier runs left behind, so that collections don't land in
+# arbitrary runs.
+def timeRun(func, repeats):
+    times = []
+    for i in range(max(repeats, 1)):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return { 'first' : times[0],
+             'best' : min(times),
+             'seconds' : statistics.median(times) }
+
+# peakMemory - return the peak memory allocated by Python during func
+def peakMemory(func):
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak
+
+# benchmark - return the results for the registry and each target as a
+# dictionary of { name : { 'peak' : bytes, 'first' : s, 'best' : s,
+# 'seconds' : s, 'passes' : s, 'size' : bytes } }
+def benchmark(args, directory):
+    results = {}
+
+    def loadRegistry():
+        reg = Registry()
+        reg.loadElementTree(parseXML(args.registry))
+        return reg
+    results['registry'] = { 'peak' : peakMemory(loadRegistry) }
+    results['registry'].update(timeRun(loadRegistry, args.repeats))
+
+    lvl_genvk.makeGenOpts(directory = directory, vuidFile = args.vuidfile)
+    targets = args.target
+    if (not targets):
+        targets = list(lvl_genvk.genOpts.keys())
+    for target in targets:
+        if (target not in lvl_genvk.genOpts):
+            print('No generator options for unknown target:', target, file=sys.stderr)
+            sys.exit(2)
+        (createGenerator, options) = lvl_genvk.genOpts[target]
+        reg = loadRegistry()
+        passes = []
+        def generate():
+            gen = createGenerator(errFile=sys.stderr, warnFile=sys.stderr, diagFile=None)
+            reg.setGenerator(gen)
+            if (reg.timer == None):
+                reg.apiGen(options)
+                return
+            reg.timer.beginTarget(target)
+            reg.apiGen(options)
+            reg.timer.endTarget()
+            phases = reg.timer.targets[target]['phases']
+            passes.append(phases['pass1'] + phases['pass2'])
+        results[target] = { 'peak' : peakMemory(generate) }
+        reg = loadRegistry()
+        reg.timer = PhaseTimer()
+        results[target].update(timeRun(generate, args.repeats))
+        results[target]['passes'] = statistics.median(passes)
+        results[target]['size'] = os.path.getsize(os.path.join(directory, options.filename))
+        if (not args.quiet):
+            print('* Benchmarked', target, file=sys.stderr)
+    return results
+
+# compare - print results next to their baseline values, and return the
+# number of results which regressed
+def compare(results, baseline, threshold, mintime):
+    regressions = 0
+    print('%-32s %10s %10s %12s %12s %8s %12s %12s %8s %12s %12s %8s %10s' %
+          ('name', 'first ms', 'best ms', 'median ms', 'base ms', 'change',
+           'passes ms', 'base ms', 'change', 'peak KiB', 'base KiB', 'change', 'size'))
+    for (name, result) in results.items():
+        base = baseline.get(name, {})
+        columns = ['%10.1f %10.1f' % (result['first'] * 1000.0, result['best'] * 1000.0)]
+        regressed = []
+        for (key, scale, floor) in [('seconds', 1000.0, mintime), ('passes', 1000.0, mintime),
+                                    ('peak', 1 / 1024.0, 0)]:
+            if (key not in result):
+                columns.append('%12s %12s %8s' % ('-', '-', '-'))
+                continue
+            value = result[key]
+            if (key not in base):
+                columns.append('%12.1f %12s %8s' % (value * scale, '-', '-'))
+                continue
+            change = (value - base[key]) / base[key] if base[key] else 0.0
+            columns.append('%12.1f %12.1f %+7.1f%%' % (value * scale, base[key] * scale, change * 100))
+            if (change > threshold and value - base[key] > floor):
+                regressed.append(key)
+        if ('size' in result):
+            size = '%10d' % result['size']
+            if ('size' in base and result['size'] != base['size']):
+                size += ' (was %d)' % base['size']
+                if (result['size'] > base['size'] * (1 + threshold)):
+                    regressed.append('size')
+        else:
+            size = '%10s' % '-'
+        line = '%-32s %s %s' % (name, ' '.join(columns), size)
+        if (regressed):
+            line += '  REGRESSED: ' + ', '.join(regressed)
+            regressions += 1
+        print(line)
+    return regressions
+
+if __name__ == '__main__':
+    scriptDir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Benchmark the lvl_genvk.py code generators')
+    parser.add_argument('-registry', action='store',
+                        default=os.path.join(scriptDir, 'vk.xml'),
+                        help='Use specified registry file instead of vk.xml')
+    parser.add_argument('-vuidfile', action='store',
+                        default=os.path.join(scriptDir, '..', 'layers', 'vk_validation_error_messages.h'),
+                        help='Use specified vk_validation_error_messages.h instead of the one in ../layers')
+    parser.add_argument('-repeats', action='store', type=int,
+                        default=11,
+                        help='Time the specified number of runs, comparing their median')
+    parser.add_argument('-baseline', action='store',
+                        default=None,
+                        help='Compare results against the baseline in the specified JSON file')
+    parser.add_argument('-save', action='store',
+                        default=None,
+                        help='Save results to the specified JSON file, for use as a baseline')
+    parser.add_argument('-threshold', action='store', type=float,
+                        default=0.25,
+                        help='Fraction by which a result may exceed its baseline before it is a regression')
+    parser.add_argument('-mintime', action='store', type=float,
+                        default=0.005,
+                        help='Seconds by which a time must also exceed its baseline before it is a regression')
+    parser.add_argument('-allowunmappedvuids', action='store_true',
+                        help='Treat VUIDs missing from vuid_mapping.py as undefined, e.g. for registries written by scale_registry.py')
+    parser.add_argument('target', metavar='target', nargs='*',
+                        help='Specify target(s) to benchmark, default all')
+    parser.add_argument('-quiet', action='store_true', default=False,
+                        help='Suppress progress output')
+    args = parser.parse_args()
+    vuid_mapping.allow_unmapped = args.allowunmappedvuids
+
+    directory = tempfile.mkdtemp(prefix='lvl_genvk_benchmark')
+    try:
+        results = benchmark(args, directory)
+    finally:
+        shutil.rmtree(directory)
+
+    baseline = {}
+    if (args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as infile:
+            baseline = json.load(infile)
+    regressions = compare(results, baseline, args.threshold, args.mintime)
+
+    if (args.save):
+        with open(args.save, 'w', encoding='utf-8') as outfile:
+            json.dump(results, outfile, indent = 2, sort_keys = True)
+            outfile.write('\n')
+
+    if (regressions):
+        print('%d result(s) regressed by more than %d%%' % (regressions, args.threshold * 100))
+        sys.exit(1)
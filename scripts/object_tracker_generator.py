@@ -24,6 +24,7 @@ import xml.etree.ElementTree as etree
 from generator import *
 from collections import namedtuple
 from vuid_mapping import *
+from vuid_catalog import *
 
 # ObjectTrackerGeneratorOptions - subclass of GeneratorOptions.
 #
@@ -58,6 +59,10 @@ from vuid_mapping import *
 #     parameter on a separate line
 #   alignFuncParam - if nonzero and parameters are being put on a
 #     separate line, align parameter names at the specified column
+#   vuidFile - path to vk_validation_error_messages.h. If None, it is
+#     searched for relative to the current directory.
+#   vuidCacheFile - if not None, file in which to cache the VUID catalog
+#     parsed from vuidFile
 class ObjectTrackerGeneratorOptions(GeneratorOptions):
     def __init__(self,
                  filename = None,
@@ -81,7 +86,9 @@ class ObjectTrackerGeneratorOptions(GeneratorOptions):
                  apientryp = '',
                  indentFuncProto = True,
                  indentFuncPointer = False,
-                 alignFuncParam = 0):
+                 alignFuncParam = 0,
+                 vuidFile = None,
+                 vuidCacheFile = None):
         GeneratorOptions.__init__(self, filename, directory, apiname, profile,
                                   versions, emitversions, defaultExtensions,
                                   addExtensions, removeExtensions, sortProcedure)
@@ -97,6 +104,8 @@ class ObjectTrackerGeneratorOptions(GeneratorOptions):
         self.indentFuncProto = indentFuncProto
         self.indentFuncPointer = indentFuncPointer
         self.alignFuncParam  = alignFuncParam
+        self.vuidFile        = vuidFile
+        self.vuidCacheFile   = vuidCacheFile
 
 # ObjectTrackerOutputGenerator - subclass of OutputGenerator.
 # Generates object_tracker layer object validation code
@@ -216,13 +225,15 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
         # Internal state - accumulators for different inner block text
         self.sections = dict([(section, []) for section in self.ALL_SECTIONS])
         self.cmdMembers = []
+        self.cmd_member_dict = dict()  # Map of command name to its CommandParam list, kept in step with cmdMembers
         self.cmd_feature_protect = []  # Save ifdef's for each command
         self.cmd_info_data = []        # Save the cmdinfo data for validating the handles when processing is complete
         self.structMembers = []        # List of StructMemberData records for all Vulkan structs
         self.extension_structs = []    # List of all structs or sister-structs containing handles
                                        # A sister-struct may contain no handles but shares <validextensionstructs> with one that does
         self.structTypes = dict()      # Map of Vulkan struct typename to required VkStructureType
-        self.struct_member_dict = dict()
+        self.struct_member_dict = dict() # Map of struct typename to its CommandParam list, kept in step with structMembers
+        self.struct_contains_object_cache = dict() # Memoized results of struct_contains_object
         # Named tuples to store struct and command data
         self.StructType = namedtuple('StructType', ['name', 'value'])
         self.CmdMemberData = namedtuple('CmdMemberData', ['name', 'members'])
@@ -232,43 +243,6 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
         self.StructMemberData = namedtuple('StructMemberData', ['name', 'members'])
         self.object_types = []         # List of all handle types
         self.valid_vuids = set()       # Set of all valid VUIDs
-        self.vuid_file = None
-        # Cover cases where file is built from scripts directory, Lin/Win, or Android build structure
-        vuid_filename_locations = [
-            './vk_validation_error_messages.h',
-            '../layers/vk_validation_error_messages.h',
-            '../../layers/vk_validation_error_messages.h',
-            '../../../layers/vk_validation_error_messages.h',
-            ]
-        for vuid_filename in vuid_filename_locations:
-            if os.path.isfile(vuid_filename):
-                self.vuid_file = open(vuid_filename, "r", encoding="utf8")
-                break
-        if self.vuid_file == None:
-            print("Error: Could not find vk_validation_error_messages.h")
-            quit()
-    #
-    # Check if the parameter passed in is optional
-    def paramIsOptional(self, param):
-        # See if the handle is optional
-        isoptional = False
-        # Simple, if it's optional, return true
-        optString = param.attrib.get('optional')
-        if optString:
-            if optString == 'true':
-                isoptional = True
-            elif ',' in optString:
-                opts = []
-                for opt in optString.split(','):
-                    val = opt.strip()
-                    if val == 'true':
-                        opts.append(True)
-                    elif val == 'false':
-                        opts.append(False)
-                    else:
-                        print('Unrecognized len attribute value',val)
-                isoptional = opts
-        return isoptional
     #
     # Convert decimal number to 8 digit hexadecimal lower-case representation
     def IdToHex(self, dec_num):
@@ -324,16 +298,12 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
     # Called at beginning of processing as file is opened
     def beginFile(self, genOpts):
         OutputGenerator.beginFile(self, genOpts)
-        # Open vk_validation_error_messages.h file to verify computed VUIDs
-        for line in self.vuid_file:
-            # Grab hex number from enum definition
-            vuid_list = line.split('0x')
-            # If this is a valid enumeration line, remove trailing comma and CR
-            if len(vuid_list) == 2:
-                vuid_num = vuid_list[1][:-2]
-                # Make sure this is a good hex number before adding to set
-                if len(vuid_num) == 8 and all(c in string.hexdigits for c in vuid_num):
-                    self.valid_vuids.add(vuid_num)
+        # Load the VUIDs defined in vk_validation_error_messages.h to verify computed VUIDs
+        vuid_filename = genOpts.vuidFile if genOpts.vuidFile is not None else findVuidFile()
+        if vuid_filename is None or not os.path.isfile(vuid_filename):
+            tried = [genOpts.vuidFile] if genOpts.vuidFile is not None else vuid_filename_locations
+            self.logMsg('error', 'Could not find vk_validation_error_messages.h, tried', ', '.join(tried))
+        self.valid_vuids = loadVuidCatalog(vuid_filename, genOpts.vuidCacheFile).vuids
         # File Comment
         file_comment = '// *** THIS FILE IS GENERATED - DO NOT EDIT ***\n'
         file_comment += '// See object_tracker_generator.py for modifications\n'
@@ -372,7 +342,6 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
     #
     # Now that the data is all collected and complete, generate and output the object validation routines
     def endFile(self):
-        self.struct_member_dict = dict(self.structMembers)
         # Generate the list of APIs that might need to handle wrapped extension structs
         # self.GenerateCommandWrapExtensionList()
         self.WrapCommands()
@@ -448,14 +417,6 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
         # self.sections[section].append('SECTION: ' + section + '\n')
         self.sections[section].append(text)
     #
-    # Check if the parameter passed in is a pointer
-    def paramIsPointer(self, param):
-        ispointer = False
-        for elem in param:
-            if ((elem.tag is not 'type') and (elem.tail is not None)) and '*' in elem.tail:
-                ispointer = True
-        return ispointer
-    #
     # Get the category of a type
     def getTypeCategory(self, typename):
         types = self.registry.tree.findall("types/type")
@@ -463,49 +424,25 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
             if (elem.find("name") is not None and elem.find('name').text == typename) or elem.attrib.get('name') == typename:
                 return elem.attrib.get('category')
     #
+    # Return the <type> element of a handle type, or None if the type is not a handle
+    def getHandleElem(self, handletype):
+        typeinfo = self.registry.typedict.get(handletype)
+        if typeinfo is not None and typeinfo.elem.get('category') == 'handle':
+            return typeinfo.elem
+        return None
+    #
     # Check if a parent object is dispatchable or not
     def isHandleTypeObject(self, handletype):
-        handle = self.registry.tree.find("types/type/[name='" + handletype + "'][@category='handle']")
-        if handle is not None:
-            return True
-        else:
-            return False
+        return self.getHandleElem(handletype) is not None
     #
     # Check if a parent object is dispatchable or not
     def isHandleTypeNonDispatchable(self, handletype):
-        handle = self.registry.tree.find("types/type/[name='" + handletype + "'][@category='handle']")
+        handle = self.getHandleElem(handletype)
         if handle is not None and handle.find('type').text == 'VK_DEFINE_NON_DISPATCHABLE_HANDLE':
             return True
         else:
             return False
     #
-    # Retrieve the type and name for a parameter
-    def getTypeNameTuple(self, param):
-        type = ''
-        name = ''
-        for elem in param:
-            if elem.tag == 'type':
-                type = noneStr(elem.text)
-            elif elem.tag == 'name':
-                name = noneStr(elem.text)
-        return (type, name)
-    #
-    # Retrieve the value of the len tag
-    def getLen(self, param):
-        result = None
-        len = param.attrib.get('len')
-        if len and len != 'null-terminated':
-            # For string arrays, 'len' can look like 'count,null-terminated', indicating that we
-            # have a null terminated array of strings.  We strip the null-terminated from the
-            # 'len' field and only return the parameter specifying the string count
-            if 'null-terminated' in len:
-                result = len.split(',')[0]
-            else:
-                result = len
-            # Spec has now notation for len attributes, using :: instead of platform specific pointer symbol
-            result = str(result).replace('::', '->')
-        return result
-    #
     # Generate a VkStructureType based on a structure typename
     def genVkStructureType(self, typename):
         # Add underscore between lowercase then uppercase
@@ -522,66 +459,63 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
     # declarations are supported (no nested structs etc.)
     def genStruct(self, typeinfo, typeName):
         OutputGenerator.genStruct(self, typeinfo, typeName)
-        members = typeinfo.elem.findall('.//member')
+        members = typeinfo.getMembers()
         # Iterate over members once to get length parameters for arrays
-        lens = set()
-        for member in members:
-            len = self.getLen(member)
-            if len:
-                lens.add(len)
+        lens = set(member.len for member in members if member.len)
         # Generate member info
         membersInfo = []
         for member in members:
-            # Get the member's type and name
-            info = self.getTypeNameTuple(member)
-            type = info[0]
-            name = info[1]
-            cdecl = self.makeCParamDecl(member, 0)
+            type = member.type
+            name = member.name
             # Process VkStructureType
             if type == 'VkStructureType':
-                # Extract the required struct type value from the comments
-                # embedded in the original text defining the 'typeinfo' element
-                rawXml = etree.tostring(typeinfo.elem).decode('ascii')
-                result = re.search(r'VK_STRUCTURE_TYPE_\w+', rawXml)
-                if result:
-                    value = result.group(0)
-                else:
+                # Look up the required struct type value, generating one from
+                # the struct name if the registry doesn't give it
+                value = self.registry.stypedict.get(typeName)
+                if value is None:
                     value = self.genVkStructureType(typeName)
                 # Store the required type value
                 self.structTypes[typeName] = self.StructType(name=name, value=value)
             # Store pointer/array/string info
-            extstructs = member.attrib.get('validextensionstructs') if name == 'pNext' else None
+            extstructs = member.elem.attrib.get('validextensionstructs') if name == 'pNext' else None
             membersInfo.append(self.CommandParam(type=type,
                                                  name=name,
-                                                 ispointer=self.paramIsPointer(member),
-                                                 isconst=True if 'const' in cdecl else False,
-                                                 isoptional=self.paramIsOptional(member),
+                                                 ispointer=member.ispointer,
+                                                 isconst=member.isconst,
+                                                 isoptional=member.optional,
                                                  iscount=True if name in lens else False,
-                                                 len=self.getLen(member),
+                                                 len=member.len,
                                                  extstructs=extstructs,
-                                                 cdecl=cdecl,
+                                                 cdecl=member.cdecl,
                                                  islocal=False,
                                                  iscreate=False,
                                                  isdestroy=False,
                                                  feature_protect=self.featureExtraProtect))
         self.structMembers.append(self.StructMemberData(name=typeName, members=membersInfo))
+        self.struct_member_dict[typeName] = membersInfo
     #
     # Insert a lock_guard line
     def lock_guard(self, indent):
         return '%sstd::lock_guard<std::mutex> lock(global_lock);\n' % indent
     #
-    # Determine if a struct has an object as a member or an embedded member
+    # Determine if a struct has an object as a member or an embedded member.
+    # A struct's member structs are always generated before it, so the result
+    # can't change once computed and is memoized.
     def struct_contains_object(self, struct_item):
-        struct_member_dict = dict(self.structMembers)
-        struct_members = struct_member_dict[struct_item]
-
+        if struct_item in self.struct_contains_object_cache:
+            return self.struct_contains_object_cache[struct_item]
+        struct_members = self.struct_member_dict[struct_item]
+        contains_object = False
         for member in struct_members:
             if self.isHandleTypeObject(member.type):
-                return True
-            elif member.type in struct_member_dict:
+                contains_object = True
+                break
+            elif member.type in self.struct_member_dict:
                 if self.struct_contains_object(member.type) == True:
-                    return True
-        return False
+                    contains_object = True
+                    break
+        self.struct_contains_object_cache[struct_item] = contains_object
+        return contains_object
     #
     # Return list of struct members which contain, or whose sub-structures contain an obj in a given list of parameters or members
     def getParmeterStructsWithObjects(self, item_list):
@@ -788,8 +722,7 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
         proto = cmd.find('proto/name')
         params = cmd.findall('param')
         if proto.text is not None:
-            cmd_member_dict = dict(self.cmdMembers)
-            cmd_info = cmd_member_dict[proto.text]
+            cmd_info = self.cmd_member_dict[proto.text]
             disp_name = cmd_info[0].name
             # Handle object create operations
             if cmd_info[0].iscreate:
@@ -824,60 +757,52 @@ class ObjectTrackerOutputGenerator(OutputGenerator):
 
         # Add struct-member type information to command parameter information
         OutputGenerator.genCmd(self, cmdinfo, cmdname)
-        members = cmdinfo.elem.findall('.//param')
+        members = cmdinfo.getParams()
         # Iterate over members once to get length parameters for arrays
-        lens = set()
-        for member in members:
-            len = self.getLen(member)
-            if len:
-                lens.add(len)
-        struct_member_dict = dict(self.structMembers)
+        lens = set(member.len for member in members if member.len)
         # Generate member info
         membersInfo = []
         constains_extension_structs = False
         for member in members:
-            # Get type and name of member
-            info = self.getTypeNameTuple(member)
-            type = info[0]
-            name = info[1]
-            cdecl = self.makeCParamDecl(member, 0)
+            type = member.type
+            name = member.name
             # Check for parameter name in lens set
             iscount = True if name in lens else False
-            len = self.getLen(member)
-            isconst = True if 'const' in cdecl else False
-            ispointer = self.paramIsPointer(member)
+            len = member.len
+            isconst = member.isconst
+            ispointer = member.ispointer
             # Mark param as local if it is an array of objects
             islocal = False;
             if self.isHandleTypeObject(type) == True:
                 if (len is not None) and (isconst == True):
                     islocal = True
             # Or if it's a struct that contains an object
-            elif type in struct_member_dict:
+            elif type in self.struct_member_dict:
                 if self.struct_contains_object(type) == True:
                     islocal = True
             isdestroy = True if True in [destroy_txt in cmdname for destroy_txt in ['Destroy', 'Free']] else False
             iscreate = True if True in [create_txt in cmdname for create_txt in ['Create', 'Allocate', 'Enumerate', 'RegisterDeviceEvent', 'RegisterDisplayEvent']] or ('vkGet' in cmdname and member == members[-1] and ispointer == True)  else False
-            extstructs = member.attrib.get('validextensionstructs') if name == 'pNext' else None
+            extstructs = member.elem.attrib.get('validextensionstructs') if name == 'pNext' else None
             membersInfo.append(self.CommandParam(type=type,
                                                  name=name,
                                                  ispointer=ispointer,
                                                  isconst=isconst,
-                                                 isoptional=self.paramIsOptional(member),
+                                                 isoptional=member.optional,
                                                  iscount=iscount,
                                                  len=len,
                                                  extstructs=extstructs,
-                                                 cdecl=cdecl,
+                                                 cdecl=member.cdecl,
                                                  islocal=islocal,
                                                  iscreate=iscreate,
                                                  isdestroy=isdestroy,
                                                  feature_protect=self.featureExtraProtect))
         self.cmdMembers.append(self.CmdMemberData(name=cmdname, members=membersInfo))
+        self.cmd_member_dict[cmdname] = membersInfo
         self.cmd_info_data.append(self.CmdInfoData(name=cmdname, cmdinfo=cmdinfo))
         self.cmd_feature_protect.append(self.CmdExtraProtect(name=cmdname, extra_protect=self.featureExtraProtect))
     #
     # Create code Create, Destroy, and validate Vulkan objects
     def WrapCommands(self):
-        cmd_member_dict = dict(self.cmdMembers)
         cmd_info_dict = dict(self.cmd_info_data)
         cmd_protect_dict = dict(self.cmd_feature_protect)
         for api_call in self.cmdMembers:
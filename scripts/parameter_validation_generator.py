@@ -25,6 +25,7 @@ import xml.etree.ElementTree as etree
 from generator import *
 from collections import namedtuple
 from vuid_mapping import *
+from vuid_catalog import *
 
 
 # ParameterValidationGeneratorOptions - subclass of GeneratorOptions.
@@ -59,6 +60,10 @@ from vuid_mapping import *
 #     parameter on a separate line
 #   alignFuncParam - if nonzero and parameters are being put on a
 #     separate line, align parameter names at the specified column
+#   vuidFile - path to vk_validation_error_messages.h. If None, it is
+#     searched for relative to the current directory.
+#   vuidCacheFile - if not None, file in which to cache the VUID catalog
+#     parsed from vuidFile
 class ParameterValidationGeneratorOptions(GeneratorOptions):
     def __init__(self,
                  filename = None,
@@ -82,7 +87,9 @@ class ParameterValidationGeneratorOptions(GeneratorOptions):
                  apientryp = '',
                  indentFuncProto = True,
                  indentFuncPointer = False,
-                 alignFuncParam = 0):
+                 alignFuncParam = 0,
+                 vuidFile = None,
+                 vuidCacheFile = None):
         GeneratorOptions.__init__(self, filename, directory, apiname, profile,
                                   versions, emitversions, defaultExtensions,
                                   addExtensions, removeExtensions, sortProcedure)
@@ -98,6 +105,8 @@ class ParameterValidationGeneratorOptions(GeneratorOptions):
         self.indentFuncProto = indentFuncProto
         self.indentFuncPointer = indentFuncPointer
         self.alignFuncParam  = alignFuncParam
+        self.vuidFile        = vuidFile
+        self.vuidCacheFile   = vuidCacheFile
 
 # ParameterValidationOutputGenerator - subclass of OutputGenerator.
 # Generates param checker layer code.
@@ -186,22 +195,6 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                                                         'condition', 'cdecl'])
         self.CommandData = namedtuple('CommandData', ['name', 'params', 'cdecl', 'extension_type', 'result'])
         self.StructMemberData = namedtuple('StructMemberData', ['name', 'members'])
-
-        self.vuid_file = None
-        # Cover cases where file is built from scripts directory, Lin/Win, or Android build structure
-        vuid_filename_locations = [
-            './vk_validation_error_messages.h',
-            '../layers/vk_validation_error_messages.h',
-            '../../layers/vk_validation_error_messages.h',
-            '../../../layers/vk_validation_error_messages.h',
-            ]
-        for vuid_filename in vuid_filename_locations:
-            if os.path.isfile(vuid_filename):
-                self.vuid_file = open(vuid_filename, "r", encoding="utf8")
-                break
-        if self.vuid_file == None:
-            print("Error: Could not find vk_validation_error_messages.h")
-            quit()
     #
     # Generate Copyright comment block for file
     def GenerateCopyright(self):
@@ -255,16 +248,12 @@ class ParameterValidationOutputGenerator(OutputGenerator):
         OutputGenerator.beginFile(self, genOpts)
         # C-specific
         #
-        # Open vk_validation_error_messages.h file to verify computed VUIDs
-        for line in self.vuid_file:
-            # Grab hex number from enum definition
-            vuid_list = line.split('0x')
-            # If this is a valid enumeration line, remove trailing comma and CR
-            if len(vuid_list) == 2:
-                vuid_num = vuid_list[1][:-2]
-                # Make sure this is a good hex number before adding to set
-                if len(vuid_num) == 8 and all(c in string.hexdigits for c in vuid_num):
-                    self.valid_vuids.add(vuid_num)
+        # Load the VUIDs defined in vk_validation_error_messages.h to verify computed VUIDs
+        vuid_filename = genOpts.vuidFile if genOpts.vuidFile is not None else findVuidFile()
+        if vuid_filename is None or not os.path.isfile(vuid_filename):
+            tried = [genOpts.vuidFile] if genOpts.vuidFile is not None else vuid_filename_locations
+            self.logMsg('error', 'Could not find vk_validation_error_messages.h, tried', ', '.join(tried))
+        self.valid_vuids = loadVuidCatalog(vuid_filename, genOpts.vuidCacheFile).vuids
         #
         # User-supplied prefix text, if any (list of strings)
         s = self.GenerateCopyright()
@@ -438,33 +427,21 @@ class ParameterValidationOutputGenerator(OutputGenerator):
     def genStruct(self, typeinfo, typeName):
         OutputGenerator.genStruct(self, typeinfo, typeName)
         conditions = self.structMemberValidationConditions[typeName] if typeName in self.structMemberValidationConditions else None
-        members = typeinfo.elem.findall('.//member')
+        members = typeinfo.getMembers()
         #
         # Iterate over members once to get length parameters for arrays
-        lens = set()
-        for member in members:
-            len = self.getLen(member)
-            if len:
-                lens.add(len)
+        lens = set(member.len for member in members if member.len)
         #
         # Generate member info
         membersInfo = []
         for member in members:
-            # Get the member's type and name
-            info = self.getTypeNameTuple(member)
-            type = info[0]
-            name = info[1]
-            stypeValue = ''
-            cdecl = self.makeCParamDecl(member, 0)
+            type = member.type
+            name = member.name
             # Process VkStructureType
             if type == 'VkStructureType':
-                # Extract the required struct type value from the comments embedded in the original text defining the
-                # 'typeinfo' element
-                rawXml = etree.tostring(typeinfo.elem).decode('ascii')
-                result = re.search(r'VK_STRUCTURE_TYPE_\w+', rawXml)
-                if result:
-                    value = result.group(0)
-                else:
+                # Look up the required struct type value, generating one from the struct name if the registry doesn't give it
+                value = self.registry.stypedict.get(typeName)
+                if value is None:
                     value = self.genVkStructureType(typeName)
                 # Store the required type value
                 self.structTypes[typeName] = self.StructType(name=name, value=value)
@@ -475,27 +452,27 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                 iscount = True
             # The pNext members are not tagged as optional, but are treated as optional for parameter NULL checks.  Static array
             # members are also treated as optional to skip NULL pointer validation, as they won't be NULL.
-            isstaticarray = self.paramIsStaticArray(member)
+            isstaticarray = member.staticarray
             isoptional = False
-            if self.paramIsOptional(member) or (name == 'pNext') or (isstaticarray):
+            if member.optional or (name == 'pNext') or (isstaticarray):
                 isoptional = True
             # Determine if value should be ignored by code generation.
             noautovalidity = False
-            if (member.attrib.get('noautovalidity') is not None) or ((typeName in self.structMemberBlacklist) and (name in self.structMemberBlacklist[typeName])):
+            if member.noautovalidity or ((typeName in self.structMemberBlacklist) and (name in self.structMemberBlacklist[typeName])):
                 noautovalidity = True
             membersInfo.append(self.CommandParam(type=type, name=name,
-                                                ispointer=self.paramIsPointer(member),
+                                                ispointer=member.pointerdepth,
                                                 isstaticarray=isstaticarray,
                                                 isbool=True if type == 'VkBool32' else False,
                                                 israngedenum=True if type in self.enumRanges else False,
-                                                isconst=True if 'const' in cdecl else False,
+                                                isconst=member.isconst,
                                                 isoptional=isoptional,
                                                 iscount=iscount,
                                                 noautovalidity=noautovalidity,
-                                                len=self.getLen(member),
+                                                len=member.len,
                                                 extstructs=self.registry.validextensionstructs[typeName] if name == 'pNext' else None,
                                                 condition=conditions[name] if conditions and name in conditions else None,
-                                                cdecl=cdecl))
+                                                cdecl=member.cdecl))
         self.structMembers.append(self.StructMemberData(name=typeName, members=membersInfo))
     #
     # Capture group (e.g. C "enum" type) info to be used for param check code generation.
@@ -561,35 +538,29 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                     self.func_pointers += '#endif\n'
                     self.typedefs += '#endif\n'
         if name not in self.blacklist:
-            params = cmdinfo.elem.findall('param')
+            params = cmdinfo.getParams()
             # Get list of array lengths
-            lens = set()
-            for param in params:
-                len = self.getLen(param)
-                if len:
-                    lens.add(len)
+            lens = set(param.len for param in params if param.len)
             # Get param info
             paramsInfo = []
             for param in params:
-                paramInfo = self.getTypeNameTuple(param)
-                cdecl = self.makeCParamDecl(param, 0)
                 # Check for parameter name in lens set
                 iscount = False
-                if paramInfo[1] in lens:
+                if param.name in lens:
                     iscount = True
-                paramsInfo.append(self.CommandParam(type=paramInfo[0], name=paramInfo[1],
-                                                    ispointer=self.paramIsPointer(param),
-                                                    isstaticarray=self.paramIsStaticArray(param),
-                                                    isbool=True if paramInfo[0] == 'VkBool32' else False,
-                                                    israngedenum=True if paramInfo[0] in self.enumRanges else False,
-                                                    isconst=True if 'const' in cdecl else False,
-                                                    isoptional=self.paramIsOptional(param),
+                paramsInfo.append(self.CommandParam(type=param.type, name=param.name,
+                                                    ispointer=param.pointerdepth,
+                                                    isstaticarray=param.staticarray,
+                                                    isbool=True if param.type == 'VkBool32' else False,
+                                                    israngedenum=True if param.type in self.enumRanges else False,
+                                                    isconst=param.isconst,
+                                                    isoptional=param.optional,
                                                     iscount=iscount,
-                                                    noautovalidity=True if param.attrib.get('noautovalidity') is not None else False,
-                                                    len=self.getLen(param),
+                                                    noautovalidity=param.noautovalidity,
+                                                    len=param.len,
                                                     extstructs=None,
                                                     condition=None,
-                                                    cdecl=cdecl))
+                                                    cdecl=param.cdecl))
             # Save return value information, if any
             result_type = ''
             resultinfo = cmdinfo.elem.find('proto/type')
@@ -597,48 +568,6 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                 result_type = resultinfo.text
             self.commands.append(self.CommandData(name=name, params=paramsInfo, cdecl=self.makeCDecls(cmdinfo.elem)[0], extension_type=self.extension_type, result=result_type))
     #
-    # Check if the parameter passed in is a pointer
-    def paramIsPointer(self, param):
-        ispointer = 0
-        paramtype = param.find('type')
-        if (paramtype.tail is not None) and ('*' in paramtype.tail):
-            ispointer = paramtype.tail.count('*')
-        elif paramtype.text[:4] == 'PFN_':
-            # Treat function pointer typedefs as a pointer to a single value
-            ispointer = 1
-        return ispointer
-    #
-    # Check if the parameter passed in is a static array
-    def paramIsStaticArray(self, param):
-        isstaticarray = 0
-        paramname = param.find('name')
-        if (paramname.tail is not None) and ('[' in paramname.tail):
-            isstaticarray = paramname.tail.count('[')
-        return isstaticarray
-    #
-    # Check if the parameter passed in is optional
-    # Returns a list of Boolean values for comma separated len attributes (len='false,true')
-    def paramIsOptional(self, param):
-        # See if the handle is optional
-        isoptional = False
-        # Simple, if it's optional, return true
-        optString = param.attrib.get('optional')
-        if optString:
-            if optString == 'true':
-                isoptional = True
-            elif ',' in optString:
-                opts = []
-                for opt in optString.split(','):
-                    val = opt.strip()
-                    if val == 'true':
-                        opts.append(True)
-                    elif val == 'false':
-                        opts.append(False)
-                    else:
-                        print('Unrecognized len attribute value',val)
-                isoptional = opts
-        return isoptional
-    #
     # Check if the handle passed in is optional
     # Uses the same logic as ValidityOutputGenerator.isHandleOptional
     def isHandleOptional(self, param, lenParam):
@@ -675,31 +604,6 @@ class ParameterValidationOutputGenerator(OutputGenerator):
             self.logMsg('diag', 'ParameterValidation: Generating {} for {} structure type that was not defined by the current feature'.format(value, typename))
         return value
     #
-    # Retrieve the value of the len tag
-    def getLen(self, param):
-        result = None
-        len = param.attrib.get('len')
-        if len and len != 'null-terminated':
-            # For string arrays, 'len' can look like 'count,null-terminated', indicating that we have a null terminated array of
-            # strings.  We strip the null-terminated from the 'len' field and only return the parameter specifying the string count
-            if 'null-terminated' in len:
-                result = len.split(',')[0]
-            else:
-                result = len
-            result = str(result).replace('::', '->')
-        return result
-    #
-    # Retrieve the type and name for a parameter
-    def getTypeNameTuple(self, param):
-        type = ''
-        name = ''
-        for elem in param:
-            if elem.tag == 'type':
-                type = noneStr(elem.text)
-            elif elem.tag == 'name':
-                name = noneStr(elem.text)
-        return (type, name)
-    #
     # Find a named parameter in a parameter list
     def getParamByName(self, params, name):
         for param in params:
@@ -1172,15 +1076,17 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                     ext_test = 'if (!local_data->extensions.%s) skip |= OutputExtensionError(local_data, "%s", %s);\n' % (ext_enable_name, command.name, ext_name_define)
                     lines.insert(0, ext_test)
             if lines:
-                cmdDef = self.getCmdDef(command) + '\n'
+                cmdDecl = self.getCmdDef(command) + '\n'
                 # For a validation-only routine, change the function declaration
                 if just_validate:
                     jv_def = '// Generated function handles validation only -- API definition is in non-generated source\n'
                     jv_def += 'extern %s\n\n' % command.cdecl
-                    cmdDef = 'bool parameter_validation_' + cmdDef.split('VKAPI_CALL ',1)[1]
+                    cmdDecl = 'bool parameter_validation_' + cmdDecl.split('VKAPI_CALL ',1)[1]
                     if command.name == 'vkCreateInstance':
-                        cmdDef = cmdDef.replace('(\n', '(\n    VkInstance instance,\n')
-                    cmdDef = jv_def + cmdDef
+                        cmdDecl = cmdDecl.replace('(\n', '(\n    VkInstance instance,\n')
+                    cmdDecl = jv_def + cmdDecl
+                cmdDef = CodeWriter(indent=indent)
+                cmdDef += cmdDecl
                 cmdDef += '{\n'
 
                 # Add list of commands to skip -- just generate the routine signature and put the manual source in parameter_validation_utils.cpp
@@ -1193,13 +1099,12 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                 instance_param = command.params[0].name
                 if command.name == 'vkCreateInstance':
                     instance_param = 'instance'
-                layer_data = '    %s *local_data = GetLayerDataPtr(get_dispatch_key(%s), %s);\n' % (map_type, instance_param, map_name)
-                cmdDef += layer_data
-                cmdDef += '%sbool skip = false;\n' % indent
+                cmdDef.line('%s *local_data = GetLayerDataPtr(get_dispatch_key(%s), %s);' % (map_type, instance_param, map_name))
+                cmdDef.line('bool skip = false;')
                 if not just_validate:
                     if command.result != '':
-                        cmdDef += indent + '%s result = VK_ERROR_VALIDATION_FAILED_EXT;\n' % command.result
-                    cmdDef += '%sstd::unique_lock<std::mutex> lock(global_lock);\n' % indent
+                        cmdDef.line('%s result = VK_ERROR_VALIDATION_FAILED_EXT;' % command.result)
+                    cmdDef.line('std::unique_lock<std::mutex> lock(global_lock);')
                 for line in lines:
                     cmdDef += '\n'
                     if type(line) is list:
@@ -1210,30 +1115,32 @@ class ParameterValidationOutputGenerator(OutputGenerator):
                 cmdDef += '\n'
                 if not just_validate:
                     # Generate parameter list for manual fcn and down-chain calls
-                    params_text = ''
-                    for param in command.params:
-                        params_text += '%s, ' % param.name
-                    params_text = params_text[:-2]
+                    params_text = ', '.join([param.name for param in command.params])
                     # Generate call to manual function if its function pointer is non-null
-                    cmdDef += '%sPFN_manual_%s custom_func = (PFN_manual_%s)custom_functions["%s"];\n' % (indent, command.name, command.name, command.name)
-                    cmdDef += '%sif (custom_func != nullptr) {\n' % indent
-                    cmdDef += '    %sskip |= custom_func(%s);\n' % (indent, params_text)
-                    cmdDef += '%s}\n\n' % indent
+                    cmdDef.line('PFN_manual_%s custom_func = (PFN_manual_%s)custom_functions["%s"];' % (command.name, command.name, command.name))
+                    cmdDef.line('if (custom_func != nullptr) {')
+                    cmdDef.indent()
+                    cmdDef.line('skip |= custom_func(%s);' % params_text)
+                    cmdDef.dedent()
+                    cmdDef.line('}')
+                    cmdDef.line()
                     # Release the validation lock
-                    cmdDef += '%slock.unlock();\n' % indent
+                    cmdDef.line('lock.unlock();')
                     # Generate skip check and down-chain call
-                    cmdDef += '%sif (!skip) {\n'  % indent
-                    down_chain_call = '    %s' % indent
+                    cmdDef.line('if (!skip) {')
+                    cmdDef.indent()
+                    down_chain_call = ''
                     if command.result != '':
                         down_chain_call += '    result = '
                     # Generate down-chain API call
                     api_call = '%s(%s);' % (command.name, params_text)
-                    down_chain_call += 'local_data->dispatch_table.%s\n' % api_call[2:]
-                    cmdDef += down_chain_call
-                    cmdDef += '%s}\n' % indent
+                    down_chain_call += 'local_data->dispatch_table.%s' % api_call[2:]
+                    cmdDef.line(down_chain_call)
+                    cmdDef.dedent()
+                    cmdDef.line('}')
                     if command.result != '':
-                        cmdDef += '%sreturn result;\n' % indent
+                        cmdDef.line('return result;')
                 else:
-                    cmdDef += '%sreturn skip;\n' % indent
+                    cmdDef.line('return skip;')
                 cmdDef += '}\n'
-                self.validation.append(cmdDef)
+                self.validation.append(cmdDef.getvalue())
@@ -14,9 +14,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import io,os,re,string,sys,copy
+import io,os,re,string,sys,contextlib
 import xml.etree.ElementTree as etree
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+
+# lxml is an optional, faster XML backend. Fall back to the standard
+# library ElementTree when it isn't installed.
+try:
+    import lxml.etree as lxmletree
+except ImportError:
+    lxmletree = None
+
+# xmlBackends - names of the XML backends which can be used to load the
+# registry. 'etree' (Python's ElementTree) is always available.
+xmlBackends = ['etree'] + (['lxml'] if lxmletree != None else [])
+
+# parseXML - parse an XML file into an ElementTree using the specified
+# backend, falling back to 'etree' if that backend isn't available.
+#   file - XML filename
+#   backend - name of the backend, from xmlBackends
+# XML comments and processing instructions are dropped by both backends,
+# so generators see the same Elements either way.
+def parseXML(file, backend = 'etree'):
+    if (backend == 'lxml' and lxmletree != None):
+        parser = lxmletree.XMLParser(remove_comments = True, remove_pis = True)
+        return lxmletree.parse(file, parser)
+    return etree.parse(file)
 
 # matchAPIProfile - returns whether an API and profile
 #   being generated matches an element's profile
@@ -66,6 +89,82 @@ def matchAPIProfile(api, profile, elem):
             return False
     return True
 
+# ParamInfo - immutable description of a <param> or <member> Element,
+# derived once from the XML and shared by every output generator.
+#   elem - the <param> or <member> Element
+#   type - text of the nested <type> tag ('' if none)
+#   name - text of the nested <name> tag ('' if none)
+#   len - 'len' attribute with any 'null-terminated' qualifier dropped
+#     and '::' converted to '->', or None for no (or only
+#     'null-terminated') length
+#   optional - False, True, or a list of Booleans for a comma-separated
+#     'optional' attribute (e.g. optional='false,true')
+#   noautovalidity - True if the 'noautovalidity' attribute is present
+#   ispointer - True if '*' follows any child tag
+#   pointerdepth - number of '*' following the <type> tag, or 1 for a
+#     PFN_ function pointer typedef
+#   staticarray - number of '[' following the <name> tag
+#   isconst - True if 'const' appears in the declaration
+#   cdecl - unaligned declaration text, as OutputGenerator.makeCParamDecl
+#     produces with aligncol 0. <comment> tags are skipped.
+ParamInfo = namedtuple('ParamInfo', ['elem', 'type', 'name', 'len', 'optional', 'noautovalidity',
+                                     'ispointer', 'pointerdepth', 'staticarray', 'isconst', 'cdecl'])
+
+# makeParamInfo - build the ParamInfo for a <param> or <member> Element
+def makeParamInfo(param):
+    type = ''
+    name = ''
+    ispointer = False
+    pointerdepth = 0
+    staticarray = 0
+    cdecl = '    ' + (param.text or '')
+    for elem in param:
+        if (elem.tag == 'comment'):
+            continue
+        text = elem.text or ''
+        tail = elem.tail or ''
+        if ('*' in tail):
+            ispointer = True
+        if (elem.tag == 'type'):
+            type = text
+            if ('*' in tail):
+                pointerdepth = tail.count('*')
+            elif (text[:4] == 'PFN_'):
+                # Treat function pointer typedefs as a pointer to a single value
+                pointerdepth = 1
+        elif (elem.tag == 'name'):
+            name = text
+            staticarray = tail.count('[')
+        cdecl += text + tail
+    len = param.get('len')
+    if (len == 'null-terminated'):
+        len = None
+    elif (len != None):
+        # For string arrays, 'len' can look like 'count,null-terminated',
+        # indicating a null-terminated array of strings. Only the count
+        # parameter is kept.
+        if ('null-terminated' in len):
+            len = len.split(',')[0]
+        # The spec uses '::' instead of the C pointer member operator
+        len = len.replace('::', '->')
+    optional = False
+    optString = param.get('optional')
+    if (optString == 'true'):
+        optional = True
+    elif (optString and ',' in optString):
+        optional = [opt.strip() == 'true' for opt in optString.split(',')]
+    return ParamInfo(elem = param,
+                     type = type,
+                     name = name,
+                     len = len,
+                     optional = optional,
+                     noautovalidity = param.get('noautovalidity') != None,
+                     ispointer = ispointer,
+                     pointerdepth = pointerdepth,
+                     staticarray = staticarray,
+                     isconst = 'const' in cdecl,
+                     cdecl = cdecl)
+
 # BaseInfo - base class for information about a registry feature
 # (type/group/enum/command/API/extension).
 #   required - should this feature be defined during header generation
@@ -74,8 +173,11 @@ def matchAPIProfile(api, profile, elem):
 #   elem - etree Element for this feature
 #   resetState() - reset required/declared to initial values. Used
 #     prior to generating a new API interface.
+# One Info object is held for every type, enum and command in the registry,
+# so they use __slots__ rather than a per-object __dict__.
 class BaseInfo:
     """Represents the state of a registry feature, used during API generation"""
+    __slots__ = ('required', 'declared', 'elem')
     def __init__(self, elem):
         self.required = False
         self.declared = False
@@ -84,23 +186,38 @@ class BaseInfo:
         self.required = False
         self.declared = False
 
-# TypeInfo - registry information about a type. No additional state
-#   beyond BaseInfo is required.
+# TypeInfo - registry information about a type.
+#   typeDeps - names of types this type directly depends on: the type in
+#     its 'requires' attribute, followed by nested <type> tags
+#   enumDeps - names of enums in nested <enum> tags this type depends on
+#   getMembers() - tuple of ParamInfo for each <member> of a struct or
+#     union, built on first use
 class TypeInfo(BaseInfo):
     """Represents the state of a registry type"""
+    __slots__ = ('additionalValidity', 'removedValidity', 'typeDeps', 'enumDeps', 'members')
     def __init__(self, elem):
         BaseInfo.__init__(self, elem)
         self.additionalValidity = []
         self.removedValidity = []
+        self.typeDeps = [subtype.text for subtype in elem.findall('.//type')]
+        if ('requires' in elem.attrib):
+            self.typeDeps.insert(0, elem.get('requires'))
+        self.enumDeps = [subenum.text for subenum in elem.findall('.//enum')]
+        self.members = None
     def resetState(self):
         BaseInfo.resetState(self)
         self.additionalValidity = []
         self.removedValidity = []
+    def getMembers(self):
+        if (self.members == None):
+            self.members = tuple(makeParamInfo(member) for member in self.elem.findall('.//member'))
+        return self.members
 
 # GroupInfo - registry information about a group of related enums
 # in an <enums> block, generally corresponding to a C "enum" type.
 class GroupInfo(BaseInfo):
     """Represents the state of a registry <enums> group"""
+    __slots__ = ()
     def __init__(self, elem):
         BaseInfo.__init__(self, elem)
 
@@ -109,6 +226,7 @@ class GroupInfo(BaseInfo):
 #     ( '' for GLint, 'u' for GLuint, 'ull' for GLuint64 )
 class EnumInfo(BaseInfo):
     """Represents the state of a registry enum"""
+    __slots__ = ('type',)
     def __init__(self, elem):
         BaseInfo.__init__(self, elem)
         self.type = elem.get('type')
@@ -116,16 +234,26 @@ class EnumInfo(BaseInfo):
             self.type = ''
 
 # CmdInfo - registry information about a command
+#   typeDeps - names of types in nested <type> tags of the command
+#   getParams() - tuple of ParamInfo for each <param> of the command,
+#     built on first use
 class CmdInfo(BaseInfo):
     """Represents the state of a registry command"""
+    __slots__ = ('additionalValidity', 'removedValidity', 'typeDeps', 'params')
     def __init__(self, elem):
         BaseInfo.__init__(self, elem)
         self.additionalValidity = []
         self.removedValidity = []
+        self.typeDeps = [type.text for type in elem.findall('.//type')]
+        self.params = None
     def resetState(self):
         BaseInfo.resetState(self)
         self.additionalValidity = []
         self.removedValidity = []
+    def getParams(self):
+        if (self.params == None):
+            self.params = tuple(makeParamInfo(param) for param in self.elem.findall('param'))
+        return self.params
 
 # FeatureInfo - registry information about an API <feature>
 # or <extension>
@@ -141,6 +269,7 @@ class CmdInfo(BaseInfo):
 #   emit - has this feature been defined already?
 class FeatureInfo(BaseInfo):
     """Represents the state of an API feature (version/extension)"""
+    __slots__ = ('name', 'category', 'version', 'number', 'supported', 'emit')
     def __init__(self, elem):
         BaseInfo.__init__(self, elem)
         self.name = elem.get('name')
@@ -170,14 +299,25 @@ from generator import write, GeneratorOptions, OutputGenerator
 #   apidict - dictionary of <api> Elements keyed by API name
 #   extensions - list of <extension> Elements
 #   extdict - dictionary of <extension> Elements keyed by extension name
+#   typeClosures - dictionary of the transitive type and enum dependencies
+#     of a type, keyed by type name. Filled in as types are required.
+#   featureIndex - dictionary of the type, enum and command names in a
+#     <require> or <remove> tag, keyed by Element. Filled in as used.
+#   modifiedInfo - set of Info objects whose state was changed since the
+#     last apiReset()
+#   resetAll - True if apiReset() must reset every Info object, because
+#     their state is not tracked by modifiedInfo (e.g. after parseTree())
 #   gen - OutputGenerator object used to write headers / messages
 #   genOpts - GeneratorOptions object used to control which
 #     fetures to write and how to format them
 #   emitFeatures - True to actually emit features for a version / extension,
 #     or False to just treat them as emitted
+#   timer - PhaseTimer recording the time taken by loading and generation
+#     phases, or None to not record them
 # Public methods
 #   loadElementTree(etree) - load registry from specified ElementTree
-#   loadFile(filename) - load registry from XML file
+#   loadFile(filename, backend) - load registry from XML file, using
+#     backend, one of xmlBackends, to parse it
 #   setGenerator(gen) - OutputGenerator to use
 #   parseTree() - parse the registry once loaded & create dictionaries
 #   dumpReg(maxlen, filehandle) - diagnostic to dump the dictionaries
@@ -189,6 +329,7 @@ from generator import write, GeneratorOptions, OutputGenerator
 #     extensions specified there.
 #   apiReset() - call between calls to apiGen() to reset internal state
 # Private methods
+#   timePhase(name, feature) - context manager timing a phase with timer
 #   addElementInfo(elem,info,infoName,dictionary) - add feature info to dict
 #   lookupElementInfo(fname,dictionary) - lookup feature info in dict
 class Registry:
@@ -203,24 +344,40 @@ class Registry:
         self.extensions   = []
         self.requiredextensions = [] # Hack - can remove it after validity generator goes away
         self.validextensionstructs = defaultdict(list)
+        self.stypedict    = {}
         self.extdict      = {}
+        self.typeClosures = {}
+        self.featureIndex = {}
+        self.modifiedInfo = set()
+        self.resetAll     = True
         # A default output generator, so commands prior to apiGen can report
         # errors via the generator object.
         self.gen          = OutputGenerator()
         self.genOpts      = None
         self.emitFeatures = False
+        self.timer        = None
     def loadElementTree(self, tree):
         """Load ElementTree into a Registry object and parse it"""
         self.tree = tree
-        self.parseTree()
-    def loadFile(self, file):
+        with self.timePhase('parseTree'):
+            self.parseTree()
+    def loadFile(self, file, backend = 'etree'):
         """Load an API registry XML file into a Registry object and parse it"""
-        self.tree = etree.parse(file)
-        self.parseTree()
+        with self.timePhase('parseXML'):
+            self.tree = parseXML(file, backend)
+        with self.timePhase('parseTree'):
+            self.parseTree()
     def setGenerator(self, gen):
         """Specify output generator object. None restores the default generator"""
         self.gen = gen
         self.gen.setRegistry(self)
+    #
+    # timePhase - return a context manager recording the time taken by
+    # the enclosed code as the named phase, if a timer has been set
+    def timePhase(self, name, feature = None):
+        if (self.timer == None):
+            return contextlib.nullcontext()
+        return self.timer.phase(name, feature)
 
     # addElementInfo - add information about an element to the
     # corresponding dictionary
@@ -260,6 +417,10 @@ class Registry:
         """Parse the registry Element, once created"""
         # This must be the Element for the root <registry>
         self.reg = self.tree.getroot()
+        self.typeClosures = {}
+        self.featureIndex = {}
+        self.modifiedInfo = set()
+        self.resetAll = True
         #
         # Create dictionary of registry types from toplevel <types> tags
         # and add 'name' attribute to each <type> tag (where missing)
@@ -344,7 +505,7 @@ class Registry:
             # ElementTree package, an Element can have multiple parents. So
             # it must be explicitly removed from the <require> tag, leading
             # to the nested loop traversal of <require>/<enum> elements
-            # below.
+            # below. Removing it before appending it works with both.
             #
             # This code also adds a 'extnumber' attribute containing the
             # extension number, used for enumerant value calculation.
@@ -375,10 +536,9 @@ class Registry:
                         # self.gen.logMsg('diag', '*** Matching group',
                         #     groupName, 'found, adding element...')
                         gi = self.groupdict[groupName]
-                        gi.elem.append(enum)
                         # Remove element from parent <require> tag
-                        # This should be a no-op in lxml.etree
                         elem.remove(enum)
+                        gi.elem.append(enum)
                     else:
                         self.gen.logMsg('warn', '*** NO matching group',
                             groupName, 'for enum', enum.get('name'), 'found.')
@@ -401,6 +561,21 @@ class Registry:
         # Sort the lists so they don't depend on the XML order
         for parent in self.validextensionstructs:
             self.validextensionstructs[parent].sort()
+        #
+        # Construct a "stypedict" mapping the name of each struct with a
+        # VkStructureType member to the VkStructureType value it requires,
+        # taken from the member's 'values' attribute or, failing that, its
+        # <comment>.
+        self.stypedict = {}
+        for type in self.reg.findall('types/type'):
+            for member in type.findall('member'):
+                if (member.findtext('type') == 'VkStructureType'):
+                    match = re.search(r'VK_STRUCTURE_TYPE_\w+', member.get('values', ''))
+                    if (match == None):
+                        match = re.search(r'VK_STRUCTURE_TYPE_\w+', ''.join(member.itertext()))
+                    if (match != None):
+                        self.stypedict[type.get('name')] = match.group(0)
+                    break
 
     def dumpReg(self, maxlen = 40, filehandle = sys.stdout):
         """Dump all the dictionaries constructed from the Registry object"""
@@ -436,6 +611,37 @@ class Registry:
         # write('***************************************', file=filehandle)
         # write(etree.tostring(self.tree.getroot(),pretty_print=True), file=filehandle)
     #
+    # typeClosure - return the names of all types and enums which a type
+    # depends on, directly or indirectly, as a pair of lists. The closure is
+    # computed from the typeDeps / enumDeps gathered when the registry was
+    # parsed, and remembered so that each type is only walked once.
+    #   typename - name of type
+    def typeClosure(self, typename):
+        key = (typename, self.genOpts.apiname)
+        if (key in self.typeClosures):
+            return self.typeClosures[key]
+        depTypes = []
+        depEnums = []
+        visitedTypes = set([typename])
+        visitedEnums = set()
+        pending = [typename]
+        while pending:
+            type = self.lookupElementInfo(pending.pop(), self.typedict)
+            if (type == None):
+                # Reported when the type is marked
+                continue
+            for depType in type.typeDeps:
+                if (depType not in visitedTypes):
+                    visitedTypes.add(depType)
+                    depTypes.append(depType)
+                    pending.append(depType)
+            for depEnum in type.enumDeps:
+                if (depEnum not in visitedEnums):
+                    visitedEnums.add(depEnum)
+                    depEnums.append(depEnum)
+        self.typeClosures[key] = (depTypes, depEnums)
+        return self.typeClosures[key]
+    #
     # typename - name of type
     # required - boolean (to tag features as required or not)
     def markTypeRequired(self, typename, required):
@@ -445,27 +651,41 @@ class Registry:
         type = self.lookupElementInfo(typename, self.typedict)
         if (type != None):
             if (required):
-                # Tag type dependencies in 'required' attributes as
-                # required. This DOES NOT un-tag dependencies in a <remove>
-                # tag. See comments in markRequired() below for the reason.
-                if ('requires' in type.elem.attrib):
-                    depType = type.elem.get('requires')
-                    self.gen.logMsg('diag', '*** Generating dependent type',
-                        depType, 'for type', typename)
-                    self.markTypeRequired(depType, required)
-                # Tag types used in defining this type (e.g. in nested
-                # <type> tags)
-                # Look for <type> in entire <command> tree,
-                # not just immediate children
-                for subtype in type.elem.findall('.//type'):
-                    self.gen.logMsg('diag', '*** markRequired: type requires dependent <type>', subtype.text)
-                    self.markTypeRequired(subtype.text, required)
-                # Tag enums used in defining this type, for example in
+                # Tag type dependencies in 'required' attributes, types
+                # used in defining this type (e.g. in nested <type> tags),
+                # and enums used in defining this type, for example in
                 #   <member><name>member</name>[<enum>MEMBER_SIZE</enum>]</member>
-                for subenum in type.elem.findall('.//enum'):
-                    self.gen.logMsg('diag', '*** markRequired: type requires dependent <enum>', subenum.text)
-                    self.markEnumRequired(subenum.text, required)
+                # as required, recursively. This DOES NOT un-tag
+                # dependencies in a <remove> tag. See comments in
+                # markRequired() below for the reason.
+                if (self.gen.logEnabled('diag')):
+                    # Walk the dependencies one at a time, so that each
+                    # one is logged as it is tagged
+                    depTypes = type.typeDeps
+                    if ('requires' in type.elem.attrib):
+                        self.gen.logMsg('diag', '*** Generating dependent type',
+                            depTypes[0], 'for type', typename)
+                        self.markTypeRequired(depTypes[0], required)
+                        depTypes = depTypes[1:]
+                    for depType in depTypes:
+                        self.gen.logMsg('diag', '*** markRequired: type requires dependent <type>', depType)
+                        self.markTypeRequired(depType, required)
+                    for depEnum in type.enumDeps:
+                        self.gen.logMsg('diag', '*** markRequired: type requires dependent <enum>', depEnum)
+                        self.markEnumRequired(depEnum, required)
+                else:
+                    (depTypes, depEnums) = self.typeClosure(typename)
+                    for depType in depTypes:
+                        dep = self.lookupElementInfo(depType, self.typedict)
+                        if (dep != None):
+                            dep.required = required
+                            self.modifiedInfo.add(dep)
+                        else:
+                            self.gen.logMsg('warn', '*** type:', depType , 'IS NOT DEFINED')
+                    for depEnum in depEnums:
+                        self.markEnumRequired(depEnum, required)
             type.required = required
+            self.modifiedInfo.add(type)
         else:
             self.gen.logMsg('warn', '*** type:', typename , 'IS NOT DEFINED')
     #
@@ -476,9 +696,22 @@ class Registry:
         enum = self.lookupElementInfo(enumname, self.enumdict)
         if (enum != None):
             enum.required = required
+            self.modifiedInfo.add(enum)
         else:
             self.gen.logMsg('warn', '*** enum:', enumname , 'IS NOT DEFINED')
     #
+    # featureNames - return the names of the types, enums, and commands
+    # in a <require> or <remove> tag, as a tuple of three lists. These are
+    # looked up once and shared by every pass of every apiGen() call.
+    #   features - Element for <require> or <remove> tag
+    def featureNames(self, features):
+        if (features not in self.featureIndex):
+            self.featureIndex[features] = (
+                [elem.get('name') for elem in features.findall('type')],
+                [elem.get('name') for elem in features.findall('enum')],
+                [elem.get('name') for elem in features.findall('command')])
+        return self.featureIndex[features]
+    #
     # features - Element for <require> or <remove> tag
     # required - boolean (to tag features as required or not)
     def markRequired(self, features, required):
@@ -487,27 +720,28 @@ class Registry:
         # Loop over types, enums, and commands in the tag
         # @@ It would be possible to respect 'api' and 'profile' attributes
         #  in individual features, but that's not done yet.
-        for typeElem in features.findall('type'):
-            self.markTypeRequired(typeElem.get('name'), required)
-        for enumElem in features.findall('enum'):
-            self.markEnumRequired(enumElem.get('name'), required)
-        for cmdElem in features.findall('command'):
-            name = cmdElem.get('name')
+        (typeNames, enumNames, cmdNames) = self.featureNames(features)
+        for name in typeNames:
+            self.markTypeRequired(name, required)
+        for name in enumNames:
+            self.markEnumRequired(name, required)
+        for name in cmdNames:
             self.gen.logMsg('diag', '*** tagging command:', name, '-> required =', required)
             cmd = self.lookupElementInfo(name, self.cmddict)
             if (cmd != None):
                 cmd.required = required
+                self.modifiedInfo.add(cmd)
                 # Tag all parameter types of this command as required.
                 # This DOES NOT remove types of commands in a <remove>
                 # tag, because many other commands may use the same type.
                 # We could be more clever and reference count types,
                 # instead of using a boolean.
                 if (required):
-                    # Look for <type> in entire <command> tree,
-                    # not just immediate children
-                    for type in cmd.elem.findall('.//type'):
-                        self.gen.logMsg('diag', '*** markRequired: command implicitly requires dependent type', type.text)
-                        self.markTypeRequired(type.text, required)
+                    # Types in the entire <command> tree, not just
+                    # immediate children
+                    for type in cmd.typeDeps:
+                        self.gen.logMsg('diag', '*** markRequired: command implicitly requires dependent type', type)
+                        self.markTypeRequired(type, required)
             else:
                 self.gen.logMsg('warn', '*** command:', name, 'IS NOT DEFINED')
     #
@@ -526,6 +760,10 @@ class Registry:
             if (matchAPIProfile(api, profile, feature)):
                 self.markRequired(feature,False)
 
+    # assignAdditionalValidity - attach the <usage> tags in the <require>
+    # and <remove> tags of a version or extension to the commands and
+    # structs they refer to. The Elements are shared with the registry
+    # tree rather than copied; nothing modifies them.
     def assignAdditionalValidity(self, interface, api, profile):
         #
         # Loop over all usage inside all <require> tags.
@@ -533,9 +771,13 @@ class Registry:
             if (matchAPIProfile(api, profile, feature)):
                 for v in feature.findall('usage'):
                     if v.get('command'):
-                        self.cmddict[v.get('command')].additionalValidity.append(copy.deepcopy(v))
+                        info = self.cmddict[v.get('command')]
+                        info.additionalValidity.append(v)
+                        self.modifiedInfo.add(info)
                     if v.get('struct'):
-                        self.typedict[v.get('struct')].additionalValidity.append(copy.deepcopy(v))
+                        info = self.typedict[v.get('struct')]
+                        info.additionalValidity.append(v)
+                        self.modifiedInfo.add(info)
 
         #
         # Loop over all usage inside all <remove> tags.
@@ -543,9 +785,13 @@ class Registry:
             if (matchAPIProfile(api, profile, feature)):
                 for v in feature.findall('usage'):
                     if v.get('command'):
-                        self.cmddict[v.get('command')].removedValidity.append(copy.deepcopy(v))
+                        info = self.cmddict[v.get('command')]
+                        info.removedValidity.append(v)
+                        self.modifiedInfo.add(info)
                     if v.get('struct'):
-                        self.typedict[v.get('struct')].removedValidity.append(copy.deepcopy(v))
+                        info = self.typedict[v.get('struct')]
+                        info.removedValidity.append(v)
+                        self.modifiedInfo.add(info)
 
     #
     # generateFeature - generate a single type / enum group / enum / command,
@@ -570,6 +816,7 @@ class Registry:
             return
         # Always mark feature declared, as though actually emitted
         f.declared = True
+        self.modifiedInfo.add(f)
         #
         # Pull in dependent declaration(s) of the feature.
         # For types, there may be one type in the 'required' attribute of
@@ -581,19 +828,21 @@ class Registry:
         genProc = None
         if (ftype == 'type'):
             genProc = self.gen.genType
-            if ('requires' in f.elem.attrib):
-                depname = f.elem.get('requires')
-                self.gen.logMsg('diag', '*** Generating required dependent type',
-                                depname)
+            # typeDeps starts with the type in the 'requires' attribute, if any
+            requires = 'requires' in f.elem.attrib
+            for depname in f.typeDeps:
+                if requires:
+                    self.gen.logMsg('diag', '*** Generating required dependent type',
+                                    depname)
+                else:
+                    self.gen.logMsg('diag', '*** Generating required dependent <type>',
+                        depname)
+                requires = False
                 self.generateFeature(depname, 'type', self.typedict)
-            for subtype in f.elem.findall('.//type'):
-                self.gen.logMsg('diag', '*** Generating required dependent <type>',
-                    subtype.text)
-                self.generateFeature(subtype.text, 'type', self.typedict)
-            for subtype in f.elem.findall('.//enum'):
+            for depname in f.enumDeps:
                 self.gen.logMsg('diag', '*** Generating required dependent <enum>',
-                    subtype.text)
-                self.generateFeature(subtype.text, 'enum', self.enumdict)
+                    depname)
+                self.generateFeature(depname, 'enum', self.enumdict)
             # If the type is an enum group, look up the corresponding
             # group in the group dictionary and generate that instead.
             if (f.elem.get('category') == 'enum'):
@@ -608,8 +857,7 @@ class Registry:
                     f = group
         elif (ftype == 'command'):
             genProc = self.gen.genCmd
-            for type in f.elem.findall('.//type'):
-                depname = type.text
+            for depname in f.typeDeps:
                 self.gen.logMsg('diag', '*** Generating required parameter type',
                                 depname)
                 self.generateFeature(depname, 'type', self.typedict)
@@ -632,12 +880,13 @@ class Registry:
         #
         # Loop over all features inside all <require> tags.
         for features in interface.findall('require'):
-            for t in features.findall('type'):
-                self.generateFeature(t.get('name'), 'type', self.typedict)
-            for e in features.findall('enum'):
-                self.generateFeature(e.get('name'), 'enum', self.enumdict)
-            for c in features.findall('command'):
-                self.generateFeature(c.get('name'), 'command', self.cmddict)
+            (typeNames, enumNames, cmdNames) = self.featureNames(features)
+            for name in typeNames:
+                self.generateFeature(name, 'type', self.typedict)
+            for name in enumNames:
+                self.generateFeature(name, 'enum', self.enumdict)
+            for name in cmdNames:
+                self.generateFeature(name, 'command', self.cmddict)
 
     #
     # apiGen(genOpts) - generate interface for specified versions
@@ -754,17 +1003,19 @@ class Registry:
         #   match the profile attribute (if any) of the <require> and
         #   <remove> tags.
         self.gen.logMsg('diag', '*** PASS 1: TAG FEATURES ********************************************')
-        for f in features:
-            self.gen.logMsg('diag', '*** PASS 1: Tagging required and removed features for',
-                f.name)
-            self.requireAndRemoveFeatures(f.elem, self.genOpts.apiname, self.genOpts.profile)
-            self.assignAdditionalValidity(f.elem, self.genOpts.apiname, self.genOpts.profile)
+        with self.timePhase('pass1'):
+            for f in features:
+                self.gen.logMsg('diag', '*** PASS 1: Tagging required and removed features for',
+                    f.name)
+                self.requireAndRemoveFeatures(f.elem, self.genOpts.apiname, self.genOpts.profile)
+                self.assignAdditionalValidity(f.elem, self.genOpts.apiname, self.genOpts.profile)
         #
         # Pass 2: loop over specified API versions and extensions printing
         #   declarations for required things which haven't already been
         #   generated.
         self.gen.logMsg('diag', '*** PASS 2: GENERATE INTERFACES FOR FEATURES ************************')
-        self.gen.beginFile(self.genOpts)
+        with self.timePhase('beginFile'):
+            self.gen.beginFile(self.genOpts)
         for f in features:
             self.gen.logMsg('diag', '*** PASS 2: Generating interface for',
                 f.name)
@@ -774,23 +1025,34 @@ class Registry:
                     f.elem.get('name'), 'because it is not tagged for emission')
             # Generate the interface (or just tag its elements as having been
             # emitted, if they haven't been).
-            self.gen.beginFeature(f.elem, emit)
-            self.generateRequiredInterface(f.elem)
-            self.gen.endFeature()
-        self.gen.endFile()
+            with self.timePhase('pass2', f.name):
+                self.gen.beginFeature(f.elem, emit)
+                self.generateRequiredInterface(f.elem)
+                self.gen.endFeature()
+        with self.timePhase('endFile'):
+            self.gen.endFile()
     #
     # apiReset - use between apiGen() calls to reset internal state
     #
+    # After the first reset of a newly parsed registry, only the Info
+    # objects modified since the previous reset (tracked in modifiedInfo)
+    # need resetting, rather than every entry in every dictionary.
     def apiReset(self):
         """Reset type/enum/command dictionaries before generating another API"""
-        for type in self.typedict:
-            self.typedict[type].resetState()
-        for enum in self.enumdict:
-            self.enumdict[enum].resetState()
-        for cmd in self.cmddict:
-            self.cmddict[cmd].resetState()
-        for cmd in self.apidict:
-            self.apidict[cmd].resetState()
+        if (self.resetAll):
+            for type in self.typedict:
+                self.typedict[type].resetState()
+            for enum in self.enumdict:
+                self.enumdict[enum].resetState()
+            for cmd in self.cmddict:
+                self.cmddict[cmd].resetState()
+            for cmd in self.apidict:
+                self.apidict[cmd].resetState()
+            self.resetAll = False
+        else:
+            for info in self.modifiedInfo:
+                info.resetState()
+        self.modifiedInfo = set()
     #
     # validateGroups - check that group= attributes match actual groups
     #
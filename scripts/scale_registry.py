@@ -0,0 +1,252 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2017 The Khronos Group Inc.
+# Copyright (c) 2017 Valve Corporation
+# Copyright (c) 2017 LunarG, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse, copy, re, sys
+import xml.etree.ElementTree as etree
+
+#############################
+# scale_registry.py
+#
+# Writes a synthetic registry which is a scaled up copy of vk.xml, for
+# measuring how reg.py and the generators behave as the API grows. With
+# -scale N, the output holds the original registry plus N-1 copies of:
+#   - every <extension>, with the types, enum groups, enums and commands
+#     it introduces
+#   - the structs, unions and commands of the core VK_VERSION_1_0
+#     feature, collected into one extension per copy named
+#     VK_KHR_core_scaled<copy>. Global commands such as vkCreateInstance,
+#     which aren't dispatched through a handle, aren't copied.
+# Each copy renames everything it clones by inserting Scaled<copy> (or
+# SCALED<copy>, scaled<copy>) before the vendor tag, e.g.
+#   vkCreateSwapchainKHR -> vkCreateSwapchainScaled2KHR
+#   VK_STRUCTURE_TYPE_PRESENT_INFO_KHR -> VK_STRUCTURE_TYPE_PRESENT_INFO_SCALED2_KHR
+#   VK_KHR_swapchain -> VK_KHR_swapchain_scaled2
+# References between cloned elements are renamed too, so a copy depends
+# on the other elements of the same copy (and on uncloned core types such
+# as handles and base types) the same way the original does. Copied
+# extensions get new extension numbers above the existing ones, so enums
+# defined by offset get distinct values.
+#
+# vuid_mapping.py has no IDs for the renamed commands and structs, so
+# generate the layer sources with lvl_genvk.py -allowunmappedvuids, which
+# treats their VUIDs as undefined.
+#
+# Example, run from the scripts directory:
+#   python3 scale_registry.py -scale 5 -o vk_x5.xml
+#   python3 lvl_genvk.py -registry vk_x5.xml -allowunmappedvuids -o out all
+
+# Attributes which name types, enums, extensions, or lists of them
+referenceAttributes = ('name', 'requires', 'parent', 'structextends',
+                       'values', 'extends', 'extension', 'alias')
+
+# Element tags whose text names a type, enum or command
+referenceTags = ('name', 'type', 'enum')
+
+# RegistryScaler - makes the scaled copies of one registry tree
+#   root - root Element of the registry, modified in place
+#   tags - vendor tags, longest first
+#   coreNames - names of the types, enums and commands required by
+#     VK_VERSION_1_0, which extension copies must not rename
+class RegistryScaler:
+    """Add renamed copies of extensions and core commands to a registry"""
+    def __init__(self, root):
+        self.root = root
+        self.tags = sorted([tag.get('name') for tag in root.findall('tags/tag')],
+                           key = len, reverse = True)
+        self.types = root.find('types')
+        self.commands = root.find('commands')
+        self.extensions = root.find('extensions')
+        self.typeElems = {}
+        for elem in self.types.findall('type'):
+            self.typeElems[self.elemName(elem)] = elem
+        self.cmdElems = {}
+        for elem in self.commands.findall('command'):
+            self.cmdElems[elem.findtext('proto/name')] = elem
+        self.groupElems = {}
+        for elem in root.findall('enums'):
+            self.groupElems[elem.get('name')] = elem
+        self.core = root.find("feature[@name='VK_VERSION_1_0']")
+        self.coreNames = set(elem.get('name') for elem in self.core.findall('require/*'))
+        self.originalExtensions = self.extensions.findall('extension')
+        self.nextNumber = max(int(ext.get('number')) for ext in self.originalExtensions) + 1
+    #
+    # elemName - name of a <type>, from its name attribute or <name> tag
+    def elemName(self, elem):
+        name = elem.get('name')
+        if (name == None):
+            name = elem.findtext('name')
+        return name
+    #
+    # isDispatchable - True if name is a dispatchable handle type
+    def isDispatchable(self, name):
+        elem = self.typeElems.get(name)
+        return (elem != None and elem.get('category') == 'handle' and
+                elem.findtext('type') == 'VK_DEFINE_HANDLE')
+    #
+    # scaledName - the name of name in copy number index
+    def scaledName(self, name, index):
+        if (re.match(r'VK_[A-Z0-9]+_[a-z0-9_]+$', name)):
+            # Extension name, e.g. VK_KHR_swapchain
+            return '%s_scaled%d' % (name, index)
+        if (re.match(r'[A-Z0-9_]+$', name)):
+            # Enum name, e.g. VK_STRUCTURE_TYPE_PRESENT_INFO_KHR
+            parts = name.split('_')
+            if (parts[-1] in self.tags):
+                parts.insert(-1, 'SCALED%d' % index)
+            else:
+                parts.append('SCALED%d' % index)
+            return '_'.join(parts)
+        # Type or command name, e.g. VkPresentInfoKHR
+        for tag in self.tags:
+            if (name.endswith(tag)):
+                return '%sScaled%d%s' % (name[:-len(tag)], index, tag)
+        return '%sScaled%d' % (name, index)
+    #
+    # renameElem - rename the references to cloned names in a copied
+    # element and its children, using renames as a dictionary of
+    # original to copied names
+    def renameElem(self, elem, renames):
+        for sub in elem.iter():
+            for attrib in referenceAttributes:
+                value = sub.get(attrib)
+                if (value != None):
+                    sub.set(attrib, ','.join([renames.get(name, name) for name in value.split(',')]))
+            if (sub.tag in referenceTags and sub.text in renames):
+                sub.text = renames[sub.text]
+            value = sub.get('value')
+            if (value != None and value.startswith('"')):
+                # Extension name string, e.g. "VK_KHR_swapchain"
+                name = value.strip('"')
+                sub.set('value', '"%s"' % renames.get(name, name))
+    #
+    # extensionRenames - add the names introduced by an extension, and the
+    # new names of its copy number index, to renames
+    def extensionRenames(self, ext, index, renames):
+        extName = ext.get('name')
+        newExtName = self.scaledName(extName, index)
+        renames[extName] = newExtName
+        for elem in ext.findall('require/*'):
+            name = elem.get('name')
+            if (name == None or name in self.coreNames):
+                continue
+            if (elem.tag == 'enum' and elem.get('value') == None and
+                    elem.get('offset') == None and elem.get('bitpos') == None):
+                # Reference to an enum defined elsewhere, e.g. an API constant
+                continue
+            if (elem.tag == 'enum' and elem.get('extends') == None and
+                    (name.endswith('_EXTENSION_NAME') or name.endswith('_SPEC_VERSION'))):
+                # Keep the VK_<EXTENSION>_EXTENSION_NAME naming the generators expect
+                suffix = name[name.rindex('_', 0, name.rindex('_')):]
+                renames[name] = newExtName.upper() + suffix
+            else:
+                renames[name] = self.scaledName(name, index)
+    #
+    # coreExtension - make an extension copying the core structs, unions
+    # and commands, adding their new names to renames
+    def coreExtension(self, index, number, renames):
+        ext = etree.Element('extension', { 'name' : 'VK_KHR_core_scaled%d' % index,
+                                           'number' : str(number),
+                                           'type' : 'device',
+                                           'author' : 'KHR',
+                                           'contact' : 'scale_registry.py',
+                                           'supported' : 'vulkan' })
+        require = etree.SubElement(ext, 'require')
+        etree.SubElement(require, 'enum', { 'value' : '1',
+                                            'name' : 'VK_KHR_CORE_SCALED%d_SPEC_VERSION' % index })
+        etree.SubElement(require, 'enum', { 'value' : '"%s"' % ext.get('name'),
+                                            'name' : 'VK_KHR_CORE_SCALED%d_EXTENSION_NAME' % index })
+        offset = 0
+        for elem in self.core.findall('require/type'):
+            typeElem = self.typeElems.get(elem.get('name'))
+            if (typeElem == None or typeElem.get('category') not in ['struct', 'union']):
+                continue
+            renames[elem.get('name')] = self.scaledName(elem.get('name'), index)
+            for member in typeElem.findall('member'):
+                sType = member.get('values')
+                if (sType != None and member.findtext('name') == 'sType'):
+                    renames[sType] = self.scaledName(sType, index)
+                    etree.SubElement(require, 'enum', { 'offset' : str(offset),
+                                                        'extends' : 'VkStructureType',
+                                                        'name' : sType })
+                    offset += 1
+            etree.SubElement(require, 'type', { 'name' : elem.get('name') })
+        for elem in self.core.findall('require/command'):
+            if (not self.isDispatchable(self.cmdElems[elem.get('name')].findtext('param/type'))):
+                # Global commands like vkCreateInstance are special cased
+                # by name in the generators, so can't be copied
+                continue
+            renames[elem.get('name')] = self.scaledName(elem.get('name'), index)
+            etree.SubElement(require, 'command', { 'name' : elem.get('name') })
+        return ext
+    #
+    # addCopy - add copy number index of the extensions and core commands
+    def addCopy(self, index):
+        renames = {}
+        newExtensions = []
+        for ext in self.originalExtensions:
+            self.extensionRenames(ext, index, renames)
+            newExt = copy.deepcopy(ext)
+            newExt.set('number', str(self.nextNumber))
+            self.nextNumber += 1
+            newExtensions.append(newExt)
+        newExtensions.append(self.coreExtension(index, self.nextNumber, renames))
+        self.nextNumber += 1
+        # The enums of a copied group are copied with it
+        for name in [name for name in renames if name in self.groupElems]:
+            for elem in self.groupElems[name].findall('enum'):
+                renames[elem.get('name')] = self.scaledName(elem.get('name'), index)
+        # Clone the types, enum groups and commands being renamed
+        for name in [name for name in renames if name in self.typeElems]:
+            newElem = copy.deepcopy(self.typeElems[name])
+            self.renameElem(newElem, renames)
+            self.types.append(newElem)
+        lastGroup = list(self.root).index(self.root.findall('enums')[-1])
+        for name in [name for name in renames if name in self.groupElems]:
+            newElem = copy.deepcopy(self.groupElems[name])
+            self.renameElem(newElem, renames)
+            lastGroup += 1
+            self.root.insert(lastGroup, newElem)
+        for name in [name for name in renames if name in self.cmdElems]:
+            newElem = copy.deepcopy(self.cmdElems[name])
+            self.renameElem(newElem, renames)
+            self.commands.append(newElem)
+        for ext in newExtensions:
+            self.renameElem(ext, renames)
+            self.extensions.append(ext)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a scaled up copy of the Vulkan registry')
+    parser.add_argument('-registry', action='store',
+                        default='vk.xml',
+                        help='Use specified registry file instead of vk.xml')
+    parser.add_argument('-scale', action='store', type=int,
+                        default=2,
+                        help='Write the registry with its extensions and core commands repeated the specified number of times')
+    parser.add_argument('-o', action='store', dest='output',
+                        required=True,
+                        help='Write the scaled registry to the specified file')
+    args = parser.parse_args()
+
+    if (args.scale < 1):
+        print('Error: -scale must be at least 1', file=sys.stderr)
+        sys.exit(1)
+    tree = etree.parse(args.registry)
+    scaler = RegistryScaler(tree.getroot())
+    for index in range(2, args.scale + 1):
+        scaler.addCopy(index)
+    tree.write(args.output, encoding='UTF-8', xml_declaration=True)
@@ -306,14 +306,6 @@ class UniqueObjectsOutputGenerator(OutputGenerator):
         # self.sections[section].append('SECTION: ' + section + '\n')
         self.sections[section].append(text)
     #
-    # Check if the parameter passed in is a pointer
-    def paramIsPointer(self, param):
-        ispointer = False
-        for elem in param:
-            if ((elem.tag is not 'type') and (elem.tail is not None)) and '*' in elem.tail:
-                ispointer = True
-        return ispointer
-    #
     # Get the category of a type
     def getTypeCategory(self, typename):
         types = self.registry.tree.findall("types/type")
@@ -329,33 +321,6 @@ class UniqueObjectsOutputGenerator(OutputGenerator):
         else:
             return False
     #
-    # Retrieve the type and name for a parameter
-    def getTypeNameTuple(self, param):
-        type = ''
-        name = ''
-        for elem in param:
-            if elem.tag == 'type':
-                type = noneStr(elem.text)
-            elif elem.tag == 'name':
-                name = noneStr(elem.text)
-        return (type, name)
-    #
-    # Retrieve the value of the len tag
-    def getLen(self, param):
-        result = None
-        len = param.attrib.get('len')
-        if len and len != 'null-terminated':
-            # For string arrays, 'len' can look like 'count,null-terminated', indicating that we
-            # have a null terminated array of strings.  We strip the null-terminated from the
-            # 'len' field and only return the parameter specifying the string count
-            if 'null-terminated' in len:
-                result = len.split(',')[0]
-            else:
-                result = len
-            # Spec has now notation for len attributes, using :: instead of platform specific pointer symbol
-            result = str(result).replace('::', '->')
-        return result
-    #
     # Generate a VkStructureType based on a structure typename
     def genVkStructureType(self, typename):
         # Add underscore between lowercase then uppercase
@@ -372,30 +337,20 @@ class UniqueObjectsOutputGenerator(OutputGenerator):
     # declarations are supported (no nested structs etc.)
     def genStruct(self, typeinfo, typeName):
         OutputGenerator.genStruct(self, typeinfo, typeName)
-        members = typeinfo.elem.findall('.//member')
+        members = typeinfo.getMembers()
         # Iterate over members once to get length parameters for arrays
-        lens = set()
-        for member in members:
-            len = self.getLen(member)
-            if len:
-                lens.add(len)
+        lens = set(member.len for member in members if member.len)
         # Generate member info
         membersInfo = []
         for member in members:
-            # Get the member's type and name
-            info = self.getTypeNameTuple(member)
-            type = info[0]
-            name = info[1]
-            cdecl = self.makeCParamDecl(member, 0)
+            type = member.type
+            name = member.name
             # Process VkStructureType
             if type == 'VkStructureType':
-                # Extract the required struct type value from the comments
-                # embedded in the original text defining the 'typeinfo' element
-                rawXml = etree.tostring(typeinfo.elem).decode('ascii')
-                result = re.search(r'VK_STRUCTURE_TYPE_\w+', rawXml)
-                if result:
-                    value = result.group(0)
-                else:
+                # Look up the required struct type value, generating one from
+                # the struct name if the registry doesn't give it
+                value = self.registry.stypedict.get(typeName)
+                if value is None:
                     value = self.genVkStructureType(typeName)
                 # Store the required type value
                 self.structTypes[typeName] = self.StructType(name=name, value=value)
@@ -403,12 +358,12 @@ class UniqueObjectsOutputGenerator(OutputGenerator):
             extstructs = self.registry.validextensionstructs[typeName] if name == 'pNext' else None
             membersInfo.append(self.CommandParam(type=type,
                                                  name=name,
-                                                 ispointer=self.paramIsPointer(member),
-                                                 isconst=True if 'const' in cdecl else False,
+                                                 ispointer=member.ispointer,
+                                                 isconst=member.isconst,
                                                  iscount=True if name in lens else False,
-                                                 len=self.getLen(member),
+                                                 len=member.len,
                                                  extstructs=extstructs,
-                                                 cdecl=cdecl,
+                                                 cdecl=member.cdecl,
                                                  islocal=False,
                                                  iscreate=False,
                                                  isdestroy=False,
@@ -787,28 +742,21 @@ class UniqueObjectsOutputGenerator(OutputGenerator):
 
         # Add struct-member type information to command parameter information
         OutputGenerator.genCmd(self, cmdinfo, cmdname)
-        members = cmdinfo.elem.findall('.//param')
+        members = cmdinfo.getParams()
         # Iterate over members once to get length parameters for arrays
-        lens = set()
-        for member in members:
-            len = self.getLen(member)
-            if len:
-                lens.add(len)
+        lens = set(member.len for member in members if member.len)
         struct_member_dict = dict(self.structMembers)
         # Generate member info
         membersInfo = []
         constains_extension_structs = False
         for member in members:
-            # Get type and name of member
-            info = self.getTypeNameTuple(member)
-            type = info[0]
-            name = info[1]
-            cdecl = self.makeCParamDecl(member, 0)
+            type = member.type
+            name = member.name
             # Check for parameter name in lens set
             iscount = True if name in lens else False
-            len = self.getLen(member)
-            isconst = True if 'const' in cdecl else False
-            ispointer = self.paramIsPointer(member)
+            len = member.len
+            isconst = member.isconst
+            ispointer = member.ispointer
             # Mark param as local if it is an array of NDOs
             islocal = False;
             if self.isHandleTypeNonDispatchable(type) == True:
@@ -828,7 +776,7 @@ class UniqueObjectsOutputGenerator(OutputGenerator):
                                                  iscount=iscount,
                                                  len=len,
                                                  extstructs=extstructs,
-                                                 cdecl=cdecl,
+                                                 cdecl=member.cdecl,
                                                  islocal=islocal,
                                                  iscreate=iscreate,
                                                  isdestroy=isdestroy,
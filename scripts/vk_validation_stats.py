@@ -22,6 +22,7 @@ import argparse
 import os
 import sys
 import platform
+from vuid_catalog import loadVuidCatalog
 
 # vk_validation_stats.py overview
 # This script is intended to generate statistics on the state of validation code
@@ -150,26 +151,11 @@ class ValidationDatabase:
 
 class ValidationHeader:
     def __init__(self, filename=header_file):
-        self.filename = header_file
+        self.filename = filename
         self.enums = []
     def read(self):
         """Read unique error enum header file into internal data structures"""
-        grab_enums = False
-        with open(self.filename, "r") as infile:
-            for line in infile:
-                line = line.strip()
-                if 'enum UNIQUE_VALIDATION_ERROR_CODE {' in line:
-                    grab_enums = True
-                    continue
-                if grab_enums:
-                    if 'VALIDATION_ERROR_MAX_ENUM' in line:
-                        grab_enums = False
-                        break # done
-                    elif 'VALIDATION_ERROR_UNDEFINED' in line:
-                        continue
-                    elif 'VALIDATION_ERROR_' in line:
-                        enum = line.split(' = ')[0]
-                        self.enums.append(enum)
+        self.enums = loadVuidCatalog(self.filename).enums
         #print "Found %d error enums. First is %s and last is %s." % (len(self.enums), self.enums[0], self.enums[-1])
 
 class ValidationSource:
@@ -0,0 +1,144 @@
+#!/usr/bin/python3 -i
+#
+# Copyright (c) 2017 The Khronos Group Inc.
+# Copyright (c) 2017 Valve Corporation
+# Copyright (c) 2017 LunarG, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os,re,sys,hashlib,pickle
+
+#############################
+# vuid_catalog.py
+#
+# Loads the unique validation error enums and messages defined in
+# vk_validation_error_messages.h. The header is parsed at most once per
+# process for each file content, and the parsed catalog can also be kept
+# in an on-disk cache keyed by a hash of the header.
+
+# Locations of vk_validation_error_messages.h relative to the current
+# directory, tried in order by findVuidFile(). They cover running from the
+# scripts directory and from the Linux/Windows and Android build trees.
+vuid_filename_locations = [
+    './vk_validation_error_messages.h',
+    '../layers/vk_validation_error_messages.h',
+    '../../layers/vk_validation_error_messages.h',
+    '../../../layers/vk_validation_error_messages.h',
+    ]
+
+# Enum definition, e.g. '    VALIDATION_ERROR_00000009 = 0x00000009,'
+enum_pattern = re.compile(r'\s*(VALIDATION_ERROR_\w+) = (\S+?),?\s*$')
+# Message map entry, e.g. '    {VALIDATION_ERROR_00000009, "The spec ..."},'
+message_pattern = re.compile(r'\s*\{(VALIDATION_ERROR_\w+), "(.*)"\},\s*$')
+hex_pattern = re.compile(r'0x([0-9a-fA-F]{8})$')
+
+# VuidCatalog - contents of vk_validation_error_messages.h
+#   enums - list of VALIDATION_ERROR_* enum names in header order, not
+#     including VALIDATION_ERROR_UNDEFINED and VALIDATION_ERROR_MAX_ENUM
+#   vuids - set of the 8 hex digit values of those enums, e.g. '00000009'
+#   messages - dictionary of enum name to its message, as the C string
+#     literal contents (escapes are not expanded)
+class VuidCatalog:
+    """Unique validation error enums and messages from vk_validation_error_messages.h"""
+    def __init__(self):
+        self.enums = []
+        self.vuids = set()
+        self.messages = {}
+    #
+    # parse - read the catalog from the lines of the header
+    def parse(self, lines):
+        in_enum = False
+        for line in lines:
+            if not in_enum:
+                if 'enum UNIQUE_VALIDATION_ERROR_CODE {' in line:
+                    in_enum = True
+                    continue
+                if '{VALIDATION_ERROR_' in line:
+                    match = message_pattern.match(line)
+                    if match:
+                        self.messages[match.group(1)] = match.group(2)
+                continue
+            match = enum_pattern.match(line)
+            if match is None:
+                if '};' in line:
+                    in_enum = False
+                continue
+            name = match.group(1)
+            if name in ['VALIDATION_ERROR_UNDEFINED', 'VALIDATION_ERROR_MAX_ENUM']:
+                continue
+            self.enums.append(name)
+            value = hex_pattern.match(match.group(2))
+            if value:
+                self.vuids.add(value.group(1))
+
+# findVuidFile - return the first of vuid_filename_locations which exists,
+# or None. Used when no explicit path to the header is given.
+def findVuidFile():
+    for vuid_filename in vuid_filename_locations:
+        if os.path.isfile(vuid_filename):
+            return vuid_filename
+    return None
+
+# Catalogs already loaded by this process, indexed by header hash
+loaded_catalogs = {}
+
+# loadVuidCatalog - return the VuidCatalog for a header, parsing it only if
+# it hasn't been loaded already by this process or saved to cacheFile.
+#   filename - path to vk_validation_error_messages.h
+#   cacheFile - if not None, file in which to save the parsed catalog and
+#     from which to reuse it while the header and this script are unchanged
+def loadVuidCatalog(filename, cacheFile = None):
+    with open(filename, 'rb') as f:
+        data = f.read()
+    hash = hashlib.sha256(data)
+    with open(__file__, 'rb') as f:
+        hash.update(f.read())
+    key = hash.hexdigest()
+    if key in loaded_catalogs:
+        return loaded_catalogs[key]
+    catalog = None
+    if cacheFile:
+        catalog = loadCache(cacheFile, key)
+    if catalog is None:
+        catalog = VuidCatalog()
+        catalog.parse(data.decode('utf-8').splitlines())
+        if cacheFile:
+            saveCache(cacheFile, key, catalog)
+    loaded_catalogs[key] = catalog
+    return catalog
+
+# loadCache - return the catalog saved in cacheFile for key, or None if the
+# cache is missing, unreadable, or was saved for a different key
+def loadCache(cacheFile, key):
+    try:
+        with open(cacheFile, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(cache, dict) or cache.get('key') != key:
+        return None
+    return cache['catalog']
+
+# saveCache - save catalog to cacheFile for key. The cache is written to a
+# temporary file which then replaces cacheFile, so concurrent runs never
+# see a partially written cache.
+def saveCache(cacheFile, key, catalog):
+    tmpFile = cacheFile + '.' + str(os.getpid()) + '.tmp'
+    try:
+        with open(tmpFile, 'wb') as f:
+            pickle.dump({ 'key' : key, 'catalog' : catalog }, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFile, cacheFile)
+    except Exception as e:
+        print('Warning: Unable to write VUID catalog cache %s: %s' % (cacheFile, e), file=sys.stderr)
+        if os.path.exists(tmpFile):
+            os.remove(tmpFile)
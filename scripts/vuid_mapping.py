@@ -1079,6 +1079,15 @@ implicit_param_map = {
 }
 
 uniqueid_set = set() # store uniqueid to make sure we don't have duplicates
+# When True, convertVUID returns -1 for a VUID whose func/struct or param has no
+#  mapping instead of exiting, e.g. for the synthetic registries written by scale_registry.py
+allow_unmapped = False
+converted_vuids = {} # string VUID -> numerical value, for VUIDs already converted
+
+# Reverse mappings used by decodeVUID
+func_struct_name_map = dict((value, name) for (name, value) in func_struct_id_map.items())
+implicit_param_name_map = dict((value, name) for (name, value) in implicit_param_map.items())
+implicit_type_name_map = dict((value, name) for (name, value) in implicit_type_map.items())
 
 # Convert a string VUID into numerical value
 #  See "VUID Mapping Details" comment above for more info
@@ -1086,10 +1095,14 @@ def convertVUID(vuid_string):
     """Convert a string-based VUID into a numberical value"""
     #func_struct_update = False
     #imp_param_update = False
+    if vuid_string in converted_vuids:
+        return converted_vuids[vuid_string]
     if vuid_string in ['', None]:
         return -1
     vuid_parts = vuid_string.split('-')
     if vuid_parts[1] not in func_struct_id_map:
+        if allow_unmapped:
+            return -1
         print ("ERROR: Missing func/struct map value for '%s'!" % (vuid_parts[1]))
         print (" TODO: Need to add mapping for this to end of func_struct_id_map")
         print ("   replace '### ADD New func/struct mappings above this line' line with \"'%s' : %d,\"" % (vuid_parts[1], len(func_struct_id_map)))
@@ -1110,6 +1123,8 @@ def convertVUID(vuid_string):
             if vuid_parts[-2] != vuid_parts[1]: # we have a parameter
                 if vuid_parts[-2] in implicit_param_map:
                     param_id = implicit_param_map[vuid_parts[-2]]
+                elif allow_unmapped:
+                    return -1
                 else:
                     print ("ERROR: Missing param '%s' from implicit_param_map\n TODO: Please add new mapping." % (vuid_parts[-2]))
                     print ("   replace '### ADD New implicit param mappings above this line' line with \"'%s' : %d,\"" % (vuid_parts[-2], len(implicit_param_map)))
@@ -1144,4 +1159,43 @@ def convertVUID(vuid_string):
 #        print ("### ADD New implicit param mappings above this line")
 #        print ("}")
 
+    converted_vuids[vuid_string] = uniqueid
     return uniqueid
+
+# Convert a list of string VUIDs into a list of their numerical values
+def convertVUIDs(vuid_strings):
+    """Convert a list of string-based VUIDs into numerical values"""
+    return [convertVUID(vuid_string) for vuid_string in vuid_strings]
+
+# Convert a numerical VUID back into its string form
+#  vuid_num may be an int or a 'VALIDATION_ERROR_xxxxxxxx' enum name.
+#  The string is rebuilt from the reverse mappings, with two
+#  limitations of the numerical encoding: explicit VUIDs don't record the
+#  param name, so decode as VUID-<func|struct>-<uniqueid>, and implicit VUIDs
+#  with param value 0 decode with no param.
+#  Returns None for values that don't map to a known func/struct, param or type.
+def decodeVUID(vuid_num):
+    """Convert a numerical VUID into a string-based VUID"""
+    if not isinstance(vuid_num, int):
+        vuid_num = int(vuid_num.replace('VALIDATION_ERROR_', ''), 16)
+    func_struct = func_struct_name_map.get(vuid_num >> FUNC_STRUCT_SHIFT)
+    if func_struct is None:
+        return None
+    id_bits = vuid_num & ((1 << FUNC_STRUCT_SHIFT) - 1)
+    if (id_bits & 0x1) == explicit_bit0:
+        return 'VUID-%s-%05d' % (func_struct, id_bits >> EXPLICIT_ID_SHIFT)
+    implicit_type = implicit_type_name_map.get((id_bits & ((1 << IMPLICIT_PARAM_SHIFT) - 1)) >> IMPLICIT_TYPE_SHIFT)
+    if implicit_type is None:
+        return None
+    param_id = id_bits >> IMPLICIT_PARAM_SHIFT
+    if param_id == 0:
+        return 'VUID-%s-%s' % (func_struct, implicit_type)
+    param = implicit_param_name_map.get(param_id)
+    if param is None:
+        return None
+    return 'VUID-%s-%s-%s' % (func_struct, param, implicit_type)
+
+# Convert a list of numerical VUIDs back into their string forms
+def decodeVUIDs(vuid_nums):
+    """Convert a list of numerical VUIDs into string-based VUIDs"""
+    return [decodeVUID(vuid_num) for vuid_num in vuid_nums]